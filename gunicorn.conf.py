@@ -0,0 +1,11 @@
+# Gunicorn settings, picked up automatically by `gunicorn tnt:app`
+import os
+
+# A single worker process: the sheet cache and the Google write queue live in
+# process memory, so extra workers would each fetch from Google separately and
+# not see each other's write-through updates
+workers = 1
+
+# Requests mostly wait on Google or read the cache, so threads provide the concurrency
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
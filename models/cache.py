@@ -1,19 +1,22 @@
-import json
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional, Callable
 
+import orjson
+
 
 @dataclass
 class CacheEntry:
     """Represents a cached sheet's data"""
     data: List[Dict[str, Any]]
-    timestamp: float
+    timestamp: float  # time.monotonic() - immune to system clock changes
     size_bytes: int
+    # Structures derived from data (indexes, groupings), built on first use
+    views: Dict[str, Any] = field(default_factory=dict, repr=False)
 
     def age(self) -> float:
         """Returns how old this cache entry is in seconds"""
-        return time.time() - self.timestamp
+        return time.monotonic() - self.timestamp
 
     def is_stale(self, ttl: int) -> bool:
         """Returns True if cache has exceeded its TTL"""
@@ -25,14 +28,28 @@ class CacheEntry:
 
     def mark_fresh(self):
         """Update timestamp to current time"""
-        self.timestamp = time.time()
+        self.timestamp = time.monotonic()
 
     def add_row(self, row: Dict[str, Any]):
         """Append a row and update size estimate"""
         self.data.append(row)
-        self.size_bytes += len(json.dumps(row).encode('utf-8'))
+        self.size_bytes += len(orjson.dumps(row))  # same encoder as the fetch paths
+        self.clear_views()
         self.mark_fresh()
 
+    def get_view(self, name: str, build: Callable[[List[Dict[str, Any]]], Any]) -> Any:
+        """Get a structure derived from the rows, building it on first use"""
+        views = self.views
+        if name not in views:
+            # Stored on the dict we started with, so a view built while the rows
+            # change is dropped along with that dict instead of going stale
+            views[name] = build(self.data)
+        return views[name]
+
+    def clear_views(self):
+        """Drop derived structures after the rows change"""
+        self.views = {}
+
 
 class CacheManager:
     """Manages the cache for all sheets"""
@@ -52,7 +69,7 @@ class CacheManager:
         """Create or replace a cache entry"""
         self._cache[sheet_name] = CacheEntry(
             data=data,
-            timestamp=time.time(),
+            timestamp=time.monotonic(),
             size_bytes=size_bytes
         )
 
@@ -76,6 +93,7 @@ class CacheManager:
         for row in cached.data:
             if match_fn(row):
                 row.update(updates)
+                cached.clear_views()
                 cached.mark_fresh()
                 print(f"[SHEETS] 📝 Cache updated for '{sheet_name}' (update)")
                 return True
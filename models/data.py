@@ -3,15 +3,29 @@ Abstract data layer for record storage.
 Routes should use this module for all data operations.
 """
 import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Optional
 
-from models.fields import TIMESTAMP
+from gspread.exceptions import APIError
+from gspread.utils import rowcol_to_a1
+from requests.exceptions import ConnectTimeout
+
+from models.fields import TIMESTAMP, NAME, DATE, TEAM, GROUP, SILVER_CREDIT, GOLD_CREDIT
+from models.utils import date_key, is_truthy
 from models.sheets import (
     get_sheet_data as _get_sheet_data,
+    get_sheet_view as _get_sheet_view,
+    _fetch_sheets,
     get_worksheet as _get_worksheet,
+    refresh_worksheets as _refresh_worksheets,
+    get_header_index as _get_header_index,
+    retry_sheets as _retry_sheets,
     _cache,
     _trigger_background_refresh,
     INVALIDATION_MAP,
+    APPEND_RETRYABLE_STATUS_CODES,
     SCHEDULE_SHEET,
     ATTENDANCE_SCHEDULE_SHEET,
     MASTER_ROSTER_SHEET,
@@ -22,7 +36,27 @@ from models.sheets import (
     RateLimitError,
     get_metrics,
 )
-from models.metrics import log_api_call
+from models.metrics import log_api_call, log_write_failure
+
+
+# Google writes run in submission order on a single background worker, so an
+# update can never overtake the append of the row it edits
+_write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sheets-write')
+
+# New rows waiting for the writer, per table, as (row, failed attempts) pairs.
+# A queued flush writes every row that arrived before it ran, so bursts of
+# submissions share one append_rows.
+_pending_appends = defaultdict(list)
+_queued_flushes = set()    # Tables with a flush waiting on the writer
+_pending_appends_lock = threading.Lock()
+
+# An append that certainly never reached Google (rate limited, unauthorized,
+# connection never made) is put back and flushed again after a delay. Anything
+# else may have added the rows already, so it is dropped rather than risk
+# duplicates. A row is given up on after APPEND_MAX_ATTEMPTS failures.
+APPEND_RETRY_DELAY_SECONDS = 10
+APPEND_MAX_ATTEMPTS = 3
+APPEND_REQUEUE_STATUS_CODES = frozenset({401, 429})
 
 
 # =============================================================================
@@ -39,29 +73,95 @@ def get_attendance_schedule():
     return _get_sheet_data(ATTENDANCE_SCHEDULE_SHEET)
 
 
+def get_schedule_day(date) -> Optional[dict]:
+    """Get the main schedule row for a date, or None."""
+    by_date = _get_sheet_view(SCHEDULE_SHEET, 'by_date', _index_by_date)
+    return by_date.get(date_key(date))
+
+
+def get_attendance_day(date) -> Optional[dict]:
+    """Get the attendance schedule row for a date, or None."""
+    by_date = _get_sheet_view(ATTENDANCE_SCHEDULE_SHEET, 'by_date', _index_by_date)
+    return by_date.get(date_key(date))
+
+
 def get_roster():
     """Get all students from the master roster."""
     return _get_sheet_data(MASTER_ROSTER_SHEET)
 
 
-def get_weekly_totals():
-    """Get weekly section completion totals."""
-    return _get_sheet_data(WEEKLY_TOTALS_SHEET)
+def get_student(name: str) -> Optional[dict]:
+    """Get a student's roster row by name, or None."""
+    by_name = _get_sheet_view(MASTER_ROSTER_SHEET, 'by_name', _index_by_name)
+    return by_name.get(name.lower())
+
+
+def get_team_roster(team: str) -> list:
+    """Get the roster rows for a team's kids."""
+    by_group = _get_sheet_view(MASTER_ROSTER_SHEET, 'by_group', _group_by_group)
+    return by_group.get(team.lower(), [])
+
+
+def get_completed_sections_for_team(date, team: str) -> list:
+    """Get the completed section records for a team on a date."""
+    by_date_team = _get_sheet_view(COMPLETED_SECTIONS_SHEET, 'by_date_team', _group_by_date_team)
+    return by_date_team.get((date_key(date), team.lower()), [])
+
+
+def get_weekly_totals_for_date(date) -> list:
+    """Get the weekly section totals rows (one per team) for a date."""
+    by_date = _get_sheet_view(WEEKLY_TOTALS_SHEET, 'by_date', _group_by_date)
+    return by_date.get(date_key(date), [])
+
 
+def get_attendance_totals_for_date(date) -> list:
+    """Get the weekly attendance totals rows (one per team) for a date."""
+    by_date = _get_sheet_view(WEEKLY_ATTENDANCE_TOTALS_SHEET, 'by_date', _group_by_date)
+    return by_date.get(date_key(date), [])
 
-def get_attendance_totals():
-    """Get weekly attendance totals."""
-    return _get_sheet_data(WEEKLY_ATTENDANCE_TOTALS_SHEET)
 
+def get_weekly_totals_for_team(date, team: str) -> Optional[dict]:
+    """Get a team's weekly section totals row for a date, or None."""
+    by_date_team = _get_sheet_view(WEEKLY_TOTALS_SHEET, 'by_date_team', _group_by_date_team)
+    rows = by_date_team.get((date_key(date), team.lower()))
+    return rows[0] if rows else None
 
-def get_completed_sections():
-    """Get all completed section records."""
-    return _get_sheet_data(COMPLETED_SECTIONS_SHEET)
 
+def get_attendance_totals_for_team(date, team: str) -> Optional[dict]:
+    """Get a team's weekly attendance totals row for a date, or None."""
+    by_date_team = _get_sheet_view(WEEKLY_ATTENDANCE_TOTALS_SHEET, 'by_date_team', _group_by_date_team)
+    rows = by_date_team.get((date_key(date), team.lower()))
+    return rows[0] if rows else None
 
-def get_attendance_entries():
-    """Get all attendance entry records."""
-    return _get_sheet_data(ATTENDANCE_ENTRIES_SHEET)
+
+def get_completed_sections_for_student(name: str) -> list:
+    """Get the completed section records for a student, in sheet order."""
+    by_name = _get_sheet_view(COMPLETED_SECTIONS_SHEET, 'by_name', _group_by_name)
+    return by_name.get(name.lower(), [])
+
+
+def get_student_credit_counts(name: str) -> dict:
+    """Get a student's completed section, silver credit and gold credit counts."""
+    by_name = _get_sheet_view(COMPLETED_SECTIONS_SHEET, 'credit_counts_by_name', _count_credits_by_name)
+    return dict(by_name.get(name.lower(), {'total': 0, 'silver': 0, 'gold': 0}))
+
+
+def get_attendance_entries_for_date(date) -> list:
+    """Get every team's attendance entry records for a date."""
+    by_date = _get_sheet_view(ATTENDANCE_ENTRIES_SHEET, 'by_date', _group_by_date)
+    return by_date.get(date_key(date), [])
+
+
+def get_attendance_entries_for_team(date, team: str) -> list:
+    """Get the attendance entry records for a team on a date."""
+    by_date_team = _get_sheet_view(ATTENDANCE_ENTRIES_SHEET, 'by_date_team', _group_by_date_team)
+    return by_date_team.get((date_key(date), team.lower()), [])
+
+
+def get_attendance_entry(date, team: str, name: str) -> Optional[dict]:
+    """Get a kid's attendance entry for a date, or None."""
+    by_kid = _get_sheet_view(ATTENDANCE_ENTRIES_SHEET, 'by_date_team_name', _index_by_date_team_name)
+    return by_kid.get((date_key(date), team.lower(), name.lower()))
 
 
 # =============================================================================
@@ -73,9 +173,9 @@ def insert_completed_section(data: dict) -> dict:
     return _insert_record(COMPLETED_SECTIONS_SHEET, data)
 
 
-def insert_attendance_entry(data: dict) -> dict:
-    """Record an attendance entry for a student."""
-    return _insert_record(ATTENDANCE_ENTRIES_SHEET, data)
+def insert_attendance_entries(records: list) -> list:
+    """Record attendance entries for several students with a single write."""
+    return _insert_records(ATTENDANCE_ENTRIES_SHEET, records)
 
 
 def update_completed_section(match_fn, updates: dict) -> bool:
@@ -92,38 +192,184 @@ def update_attendance_entry(match_fn, updates: dict) -> bool:
 # Internal Helpers
 # =============================================================================
 
-def _get_headers(table: str, worksheet):
-    """Get headers from cache if available, otherwise from worksheet."""
-    cached = _cache.get(table)
-    if cached and cached.data:
-        return list(cached.data[0].keys())
-    return worksheet.row_values(1)
+def _group_by_date(records: list) -> dict:
+    """Group records by normalized date."""
+    groups = defaultdict(list)
+    for row in records:
+        groups[date_key(row.get(DATE))].append(row)
+    return dict(groups)
+
+
+def _group_by_date_team(records: list) -> dict:
+    """Group records by (normalized date, lowercased team), parsing each row's date once."""
+    groups = defaultdict(list)
+    for row in records:
+        groups[(date_key(row.get(DATE)), str(row.get(TEAM, '')).lower())].append(row)
+    return dict(groups)
+
+
+def _index_by_date(records: list) -> dict:
+    """Index records by normalized date, keeping the first match."""
+    index = {}
+    for row in records:
+        index.setdefault(date_key(row.get(DATE)), row)
+    return index
+
+
+def _index_by_date_team_name(records: list) -> dict:
+    """Index records by (normalized date, lowercased team, lowercased name), keeping the first match."""
+    index = {}
+    for row in records:
+        key = (date_key(row.get(DATE)), str(row.get(TEAM, '')).lower(), str(row.get(NAME, '')).lower())
+        index.setdefault(key, row)
+    return index
+
+
+def _index_by_name(records: list) -> dict:
+    """Index records by lowercased name, keeping the first match."""
+    index = {}
+    for row in records:
+        index.setdefault(str(row.get(NAME, '')).lower(), row)
+    return index
+
+
+def _group_by_name(records: list) -> dict:
+    """Group records by lowercased student name."""
+    groups = defaultdict(list)
+    for row in records:
+        groups[str(row.get(NAME, '')).lower()].append(row)
+    return dict(groups)
+
+
+def _group_by_group(records: list) -> dict:
+    """Group roster rows by lowercased team group."""
+    groups = defaultdict(list)
+    for row in records:
+        groups[str(row.get(GROUP, '')).lower()].append(row)
+    return dict(groups)
+
+
+def _count_credits_by_name(records: list) -> dict:
+    """Count each student's sections and silver/gold credits, keyed by lowercased name."""
+    counts = {}
+    for row in records:
+        student = counts.setdefault(str(row.get(NAME, '')).lower(), {'total': 0, 'silver': 0, 'gold': 0})
+        student['total'] += 1
+        student['silver'] += is_truthy(row.get(SILVER_CREDIT, ''))
+        student['gold'] += is_truthy(row.get(GOLD_CREDIT, ''))
+    return counts
+
+
+def _row_update_ranges(row_num: int, header_index: dict, updates: dict) -> list:
+    """Build batch_update ranges for a row, one range per run of adjacent changed columns."""
+    cells = sorted((header_index[field_name], value)
+                   for field_name, value in updates.items() if field_name in header_index)
+
+    runs = []  # (start column, [values])
+    for col, value in cells:
+        if runs and runs[-1][0] + len(runs[-1][1]) == col:
+            runs[-1][1].append(value)
+        else:
+            runs.append((col, [value]))
+
+    return [
+        {
+            'range': f"{rowcol_to_a1(row_num, start)}:{rowcol_to_a1(row_num, start + len(values) - 1)}",
+            'values': [values],
+        }
+        for start, values in runs
+    ]
 
 
 def _insert_record(table: str, data: dict) -> dict:
     """Insert a new record - cache first for fast UI, then async write to Google."""
-    if TIMESTAMP not in data:
-        data[TIMESTAMP] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    return _insert_records(table, [data])[0]
 
-    # Update cache immediately for fast UI response
-    _cache.append_row(table, data)
 
-    # Queue Google write in background
-    def background_write():
-        try:
-            worksheet = _get_worksheet(table)
-            headers = _get_headers(table, worksheet)
-            row = [data.get(header, '') for header in headers]
-            worksheet.append_row(row, value_input_option='USER_ENTERED')
-            log_api_call('write', table, source='google')
-        except Exception as e:
-            print(f"[SHEETS] ❌ Background write failed for '{table}': {e}")
+def _insert_records(table: str, records: list) -> list:
+    """Insert records - cache first for fast UI, then queue them for the next append to Google."""
+    if not records:
+        return records
 
-    thread = threading.Thread(target=background_write, daemon=True)
-    thread.start()
+    for data in records:
+        if TIMESTAMP not in data:
+            data[TIMESTAMP] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        # Update cache immediately for fast UI response
+        _cache.append_row(table, data)
+
+    with _pending_appends_lock:
+        _pending_appends[table].extend((data, 0) for data in records)
+    _queue_flush(table)
 
     _refresh_related_tables(table)
-    return data
+    return records
+
+
+def _queue_flush(table: str):
+    """Queue a flush of a table's pending rows on the writer, unless one is already waiting."""
+    with _pending_appends_lock:
+        if table in _queued_flushes:
+            return
+        _queued_flushes.add(table)
+    _write_executor.submit(_flush_appends, table)
+
+
+def _schedule_flush_retry(table: str):
+    """Flush a table's pending rows again after APPEND_RETRY_DELAY_SECONDS."""
+    timer = threading.Timer(APPEND_RETRY_DELAY_SECONDS, _queue_flush, args=(table,))
+    timer.daemon = True
+    timer.start()
+
+
+def _append_not_sent(error: Exception) -> bool:
+    """Check if a failed append certainly never reached Google, so sending it again can't duplicate rows."""
+    if isinstance(error, ConnectTimeout):
+        return True
+    return isinstance(error, APIError) and error.response.status_code in APPEND_REQUEUE_STATUS_CODES
+
+
+def _requeue_appends(table: str, pending: list, error: Exception):
+    """Put rows from a failed append back ahead of newer ones, dropping rows out of attempts."""
+    retry = [(data, attempts + 1) for data, attempts in pending if attempts + 1 < APPEND_MAX_ATTEMPTS]
+    if len(retry) < len(pending):
+        log_write_failure(table, len(pending) - len(retry), error)
+    if retry:
+        with _pending_appends_lock:
+            _pending_appends[table][:0] = retry
+        log_write_failure(table, len(retry), error, requeued=True)
+        _schedule_flush_retry(table)
+
+
+def _flush_appends(table: str):
+    """Write every row queued for a table to Google in one request (runs on the writer)."""
+    with _pending_appends_lock:
+        pending = _pending_appends.pop(table, [])
+        _queued_flushes.discard(table)
+    if not pending:
+        return
+
+    try:
+        headers = _get_header_index(table)
+        _get_worksheet(table)
+    except Exception as e:
+        # Nothing was sent yet, so the rows can safely go out later
+        _requeue_appends(table, pending, e)
+        _refresh_worksheets(table)
+        return
+
+    rows = [[data.get(header, '') for header in headers] for data, _ in pending]
+    try:
+        # The worksheet is looked up per attempt, so a retry after re-authorizing uses the new client
+        _retry_sheets(lambda: _get_worksheet(table).append_rows(rows, value_input_option='USER_ENTERED'),
+                      retry_on=APPEND_RETRYABLE_STATUS_CODES)
+        log_api_call('write', table, source='google')
+    except Exception as e:
+        if _append_not_sent(e):
+            _requeue_appends(table, pending, e)
+        else:
+            log_write_failure(table, len(pending), e)
+        # The handle may be stale (sheet recreated or renamed) - resolve it again next time
+        _refresh_worksheets(table)
 
 
 def _update_record(table: str, match_fn, updates: dict) -> bool:
@@ -138,26 +384,29 @@ def _update_record(table: str, match_fn, updates: dict) -> bool:
     # Queue Google write in background
     def background_write():
         try:
-            worksheet = _get_worksheet(table)
-            all_records = worksheet.get_all_records()
-            headers = list(all_records[0].keys()) if all_records else worksheet.row_values(1)
+            # Same raw read as the cache, so match_fn sees the values it was written against
+            all_records = _fetch_sheets([table])[table]
+
+            header_index = _get_header_index(table)
+            if not header_index.keys() >= updates.keys():
+                # A column we need is missing - the sheet layout may have changed
+                header_index = _get_header_index(table, refresh=True)
 
             for i, record in enumerate(all_records):
                 if match_fn(record):
                     row_num = i + 2
-                    for field_name, value in updates.items():
-                        try:
-                            col_index = headers.index(field_name) + 1
-                            worksheet.update_cell(row_num, col_index, value)
-                        except ValueError:
-                            continue
+                    # One batch request for all changed cells instead of one call per cell
+                    row_updates = _row_update_ranges(row_num, header_index, updates)
+                    if row_updates:
+                        _retry_sheets(lambda: _get_worksheet(table).batch_update(
+                            row_updates, value_input_option='USER_ENTERED'))
                     log_api_call('write', table, source='google')
                     break
         except Exception as e:
-            print(f"[SHEETS] ❌ Background write failed for '{table}': {e}")
+            log_write_failure(table, 1, e)
+            _refresh_worksheets(table)
 
-    thread = threading.Thread(target=background_write, daemon=True)
-    thread.start()
+    _write_executor.submit(background_write)
 
     _refresh_related_tables(table)
     return True
@@ -12,6 +12,7 @@ _metrics = {
     'cache_misses': 0,
     'background_refreshes': 0,
     'rate_limit_errors': 0,
+    'failed_write_rows': 0,
     'recent_calls': deque(maxlen=100),
 }
 
@@ -78,6 +79,12 @@ def log_rate_limit_error(sheet_name, simulated=False):
     prefix = "SIMULATED " if simulated else ""
     print(f"[SHEETS] ⛔ {prefix}RATE LIMIT for '{sheet_name}'")
 
+def log_write_failure(sheet_name, row_count, error, requeued=False):
+    """Log a background Google write that failed, counting the rows it carried"""
+    _metrics['failed_write_rows'] += row_count
+    outcome = "re-queued" if requeued else "dropped"
+    print(f"[SHEETS] ❌ Background write failed for '{sheet_name}' ({row_count} row(s) {outcome}): {error}")
+
 def log_cache_invalidation(sheet_name=None):
     """Log cache invalidation"""
     if sheet_name:
@@ -97,6 +104,7 @@ def reset_metrics():
         'cache_misses': 0,
         'background_refreshes': 0,
         'rate_limit_errors': 0,
+        'failed_write_rows': 0,
         'recent_calls': deque(maxlen=100),
     }
     print("[METRICS] 🔄 All metrics reset")
@@ -124,6 +132,7 @@ def get_metrics(cache_keys=None, simulate_rate_limit=False):
         'background_refreshes': _metrics['background_refreshes'],
         'cache_hit_rate': f"{hit_rate:.1f}%",
         'rate_limit_errors': _metrics['rate_limit_errors'],
+        'failed_write_rows': _metrics['failed_write_rows'],
         'simulate_rate_limit': simulate_rate_limit,
         'google_calls_last_minute': len(google_calls_last_min),
         'cache_hits_last_minute': len(cache_calls_last_min),
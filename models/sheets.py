@@ -1,11 +1,15 @@
-import json
+import functools
 import os
+import random
+import sys
 import threading
 import time
 
 import gspread
+import orjson
 from gspread.exceptions import APIError
 from oauth2client.service_account import ServiceAccountCredentials
+from requests.adapters import HTTPAdapter
 
 from models.cache import CacheManager
 from models.metrics import log_api_call, log_rate_limit_error, log_cache_invalidation, get_metrics as _get_metrics
@@ -29,12 +33,48 @@ REFRESH_DEBOUNCE_SECONDS = 5  # Don't refresh if we refreshed within this window
 _pending_refreshes = set()    # Sheets currently being refreshed in background
 _refresh_lock = threading.Lock()
 
+# HTTP connection pool for the shared gspread session. Request threads, background
+# refreshes and the write worker can all be talking to Google at once.
+HTTP_POOL_CONNECTIONS = 10
+HTTP_POOL_MAXSIZE = 20
+
+# Schedules, totals and the roster are read as the sheet displays them - pages
+# print their percent, currency and number formatted cells as they are
+DISPLAY_GET_PARAMS = {
+    'valueRenderOption': 'FORMATTED_VALUE',
+}
+
+# The RAW entry sheets are the largest reads and only hold names, checkboxes and
+# dates, so skip number/boolean formatting on Google's side for them. Dates keep
+# their display format, which routes and URLs match against.
+RAW_GET_PARAMS = {
+    'valueRenderOption': 'UNFORMATTED_VALUE',
+    'dateTimeRenderOption': 'FORMATTED_STRING',
+}
+RAW_SHEETS = frozenset({
+    COMPLETED_SECTIONS_SHEET,
+    ATTENDANCE_ENTRIES_SHEET,
+})
+
+# Retry with exponential backoff - absorbs short rate-limit bursts and transient
+# server errors instead of failing the request on the first 429
+RETRY_MAX_TRIES = 4
+RETRY_INITIAL_WAIT = 0.5   # seconds, doubled after each failed attempt
+RETRY_MAX_WAIT = 8
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503})
+# Appends aren't idempotent - a 5xx can arrive after Google already added the
+# rows, so only retry a 429, which Google sends before doing any work
+APPEND_RETRYABLE_STATUS_CODES = frozenset({429})
+
+# Single-flight cold fetches - concurrent cold reads of a fetch group share one fetch
+_cold_fetch_locks = {}
+
 # Static sheets - only change when admin updates them (monthly or less)
-STATIC_SHEETS = [
+STATIC_SHEETS = frozenset({
     SCHEDULE_SHEET,
     ATTENDANCE_SCHEDULE_SHEET,
     MASTER_ROSTER_SHEET,
-]
+})
 
 # Sheets to invalidate when writing to RAW sheets
 # RAW sheets trigger Totals recalculation
@@ -43,6 +83,22 @@ INVALIDATION_MAP = {
     ATTENDANCE_ENTRIES_SHEET: [ATTENDANCE_ENTRIES_SHEET, WEEKLY_ATTENDANCE_TOTALS_SHEET],
 }
 
+# Sheets always read together - every page that reads a Totals sheet reads its
+# schedule first. A cold read of one also fetches whichever of the others are
+# uncached, all in the same batchGet request. The RAW sheets are left out: they
+# are the largest ranges, and the schedule index pages never need them.
+FETCH_GROUPS = (
+    (SCHEDULE_SHEET, WEEKLY_TOTALS_SHEET),
+    (ATTENDANCE_SCHEDULE_SHEET, WEEKLY_ATTENDANCE_TOTALS_SHEET),
+)
+
+# Writing to a RAW sheet must refresh the Totals sheet computed from it
+assert WEEKLY_TOTALS_SHEET in INVALIDATION_MAP[COMPLETED_SECTIONS_SHEET]
+assert WEEKLY_ATTENDANCE_TOTALS_SHEET in INVALIDATION_MAP[ATTENDANCE_ENTRIES_SHEET]
+# A batchGet has one render option, so a fetch group can't mix RAW and display sheets
+assert all(len({name in RAW_SHEETS for name in group}) == 1 for group in FETCH_GROUPS)
+
+@functools.lru_cache(maxsize=64)
 def _get_ttl_for_sheet(sheet_name):
     """Get the appropriate TTL for a sheet based on how often it changes"""
     if sheet_name in STATIC_SHEETS:
@@ -52,14 +108,117 @@ def _get_ttl_for_sheet(sheet_name):
 # Cache manager instance
 _cache = CacheManager()
 
+# Header row per sheet as {header name: 1-based column index}
+_header_cache = {}
+
+# Worksheet handles by sheet name, resolved on first use
+_worksheet_cache = {}
+
+
+def _get_fetch_group(sheet_name):
+    """Get the sheets fetched alongside sheet_name on a cold read"""
+    for group in FETCH_GROUPS:
+        if sheet_name in group:
+            return group
+    return (sheet_name,)
+
+
+def _read_headers(values):
+    """Get a sheet's header row from its values (header row first)"""
+    # Interned so every row dict of every refresh shares the same key strings
+    return [sys.intern(str(header)) for header in values[0]] if values else []
+
+
+def _build_header_index(headers):
+    """Map each header name to its 1-based column index"""
+    return {header: col for col, header in enumerate(headers, start=1)}
+
+
+def _get_batch_get_params(sheet_names):
+    """Get the batchGet render options for sheets fetched together"""
+    return RAW_GET_PARAMS if sheet_names[0] in RAW_SHEETS else DISPLAY_GET_PARAMS
+
+
+def _numericise(value):
+    """Turn a formatted cell that reads as a plain number into an int or float, as get_all_records did"""
+    if type(value) is not str or value == '' or '_' in value:
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+
+def _values_to_records(values, numericise=False):
+    """
+    Convert a sheet's values (header row first) into a list of row dicts.
+    numericise turns formatted number cells ('0', '12') back into numbers, so
+    a zero stat is falsy the same way it was with get_all_records.
+    """
+    if not values:
+        return []
+    headers = _read_headers(values)
+    width = len(headers)
+    rows = values[1:]
+    if numericise:
+        rows = [[_numericise(value) for value in row] for row in rows]
+    # The API drops trailing empty cells, so pad short rows out to the header width
+    return [dict(zip(headers, row + [''] * (width - len(row)))) for row in rows]
+
+
+def retry_sheets(fn, *args, max_tries=RETRY_MAX_TRIES, retry_on=RETRYABLE_STATUS_CODES, **kwargs):
+    """
+    Call a gspread function, retrying rate-limit and transient server errors
+    (the status codes in retry_on) with exponential backoff and jitter.
+    Re-raises once max_tries is used up.
+    A 401 drops the client and retries once with a fresh one, so fn should look
+    up its spreadsheet or worksheet handle when called, not be bound to one.
+    """
+    reauthorized = False
+    for attempt in range(1, max_tries + 1):
+        try:
+            return fn(*args, **kwargs)
+        except APIError as e:
+            if e.response.status_code == 401 and not reauthorized and attempt < max_tries:
+                # The client's authorization is no longer accepted - reconnect once and retry
+                print("[SHEETS] 🔑 Google returned 401, re-authorizing")
+                reset_spreadsheet()
+                reauthorized = True
+                continue
+            if attempt == max_tries or e.response.status_code not in retry_on:
+                raise
+            wait = min(RETRY_MAX_WAIT, RETRY_INITIAL_WAIT * 2 ** (attempt - 1))
+            # Jitter keeps concurrent retries from hitting Google in lockstep
+            wait = random.uniform(wait / 2, wait)
+            print(f"[SHEETS] ⏳ Google returned {e.response.status_code}, retry {attempt}/{max_tries - 1} in {wait:.1f}s")
+            time.sleep(wait)
+
+
+def _fetch_sheets(sheet_names):
+    """Fetch the records of one or more sheets in a single values.batchGet request"""
+    ranges = ["'{}'".format(name.replace("'", "''")) for name in sheet_names]
+    params = _get_batch_get_params(sheet_names)
+    response = retry_sheets(lambda: _get_spreadsheet_instance().values_batch_get(ranges, params=params))
+    records = {}
+    for name, value_range in zip(sheet_names, response.get('valueRanges', [])):
+        values = value_range.get('values', [])
+        if values:
+            # Keep the real header row for writes - cached rows can't be trusted for
+            # column order once write-through rows are appended to them
+            _header_cache[name] = _build_header_index(_read_headers(values))
+        records[name] = _values_to_records(values, numericise=params is DISPLAY_GET_PARAMS)
+    return records
+
 
 def _refresh_sheet_background(sheet_name):
     """Background task to refresh a sheet's cache"""
-    refresh_started = time.time()
+    refresh_started = time.monotonic()
     try:
-        spreadsheet = _get_spreadsheet_instance()
-        data = spreadsheet.worksheet(sheet_name).get_all_records()
-        size_bytes = len(json.dumps(data).encode('utf-8'))
+        data = _fetch_sheets([sheet_name])[sheet_name]
+        size_bytes = len(orjson.dumps(data))
 
         # Only update cache if it hasn't been modified (by write-through) since we started
         cached = _cache.get(sheet_name)
@@ -106,13 +265,14 @@ class RateLimitError(Exception):
         self.message = message
         super().__init__(self.message)
 
+@functools.lru_cache(maxsize=1)
 def get_google_creds():
-    """Get Google credentials either from file or environment variable"""
+    """Get Google credentials either from file or environment variable (parsed once per process)"""
     scope = ['https://spreadsheets.google.com/feeds',
              'https://www.googleapis.com/auth/drive']
 
     if 'GOOGLE_SHEETS_CREDS' in os.environ:
-        creds_dict = json.loads(os.environ['GOOGLE_SHEETS_CREDS'])
+        creds_dict = orjson.loads(os.environ['GOOGLE_SHEETS_CREDS'])
         return ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
     else:
         return ServiceAccountCredentials.from_json_keyfile_name('client_secret.json', scope)
@@ -121,18 +281,40 @@ def get_spreadsheet():
     """Get the Google Sheets spreadsheet"""
     creds = get_google_creds()
     client = gspread.authorize(creds)
+    # gspread's AuthorizedSession already keeps connections alive; size its pool
+    # so concurrent calls reuse connections instead of opening and dropping extras
+    client.http_client.session.mount('https://', HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE))
     sheet_name = os.environ.get('SHEET_NAME', 'TNT_App_Data')
     return client.open(sheet_name)
 
 _spreadsheet = None
+_spreadsheet_lock = threading.Lock()
 
 def _get_spreadsheet_instance():
     """Get or create the spreadsheet singleton"""
     global _spreadsheet
     if _spreadsheet is None:
-        _spreadsheet = get_spreadsheet()
+        # Request and background threads can race here on a cold start;
+        # only one of them should authorize and open the spreadsheet
+        with _spreadsheet_lock:
+            if _spreadsheet is None:
+                _spreadsheet = get_spreadsheet()
     return _spreadsheet
 
+def reset_spreadsheet():
+    """Drop the spreadsheet client, credentials and worksheet handles so the next call re-authorizes"""
+    global _spreadsheet
+    with _spreadsheet_lock:
+        _spreadsheet = None
+    get_google_creds.cache_clear()
+    refresh_worksheets()
+
+def _get_cold_fetch_lock(group):
+    """Get the lock guarding the synchronous cold fetch of a fetch group"""
+    with _refresh_lock:
+        return _cold_fetch_locks.setdefault(group, threading.Lock())
+
 def get_sheet_data(sheet_name):
     """
     Get data from any sheet using stale-while-revalidate pattern.
@@ -160,33 +342,94 @@ def get_sheet_data(sheet_name):
             _trigger_background_refresh(sheet_name)
             return cached.data
 
-    # Cold start - no cache at all, must fetch synchronously
-    try:
-        spreadsheet = _get_spreadsheet_instance()
-        data = spreadsheet.worksheet(sheet_name).get_all_records()
-    except APIError as e:
-        if e.response.status_code == 429:
-            log_rate_limit_error(sheet_name)
-            raise RateLimitError()
-        raise
-
-    size_bytes = len(json.dumps(data).encode('utf-8'))
-
-    # Store in cache
-    _cache.set(sheet_name, data, size_bytes)
+    # Cold start - no cache at all, must fetch synchronously.
+    # Only one request per fetch group fetches; concurrent requests for any
+    # sheet of the group wait and read its result.
+    group = _get_fetch_group(sheet_name)
+    with _get_cold_fetch_lock(group):
+        cached = _cache.get(sheet_name)
+        if cached:
+            log_api_call('read', sheet_name, cached.size_bytes, source='cache')
+            return cached.data
 
-    log_api_call('read', sheet_name, size_bytes, source='google')
-    return data
+        # Batch in any uncached sheets the same pages read, saving their round-trips
+        companions = [name for name in group
+                      if name != sheet_name and not _cache.has(name)]
+        try:
+            fetched = _fetch_sheets([sheet_name] + companions)
+        except APIError as e:
+            if e.response.status_code == 429:
+                log_rate_limit_error(sheet_name)
+                raise RateLimitError()
+            raise
+
+        # Store in cache
+        for name, records in fetched.items():
+            size_bytes = len(orjson.dumps(records))
+            _cache.set(name, records, size_bytes)
+            log_api_call('read', name, size_bytes, source='google')
+
+    return fetched[sheet_name]
+
+def get_sheet_view(sheet_name, view_name, build):
+    """
+    Get a structure derived from a sheet's rows, such as an index keyed for a
+    page's lookups. It is built once per cached copy of the sheet and rebuilt
+    after a refresh or write-through changes the rows.
+    """
+    data = get_sheet_data(sheet_name)
+    cached = _cache.get(sheet_name)
+    if cached is None or cached.data is not data:
+        # Cache was replaced between the read and now - build from what we read
+        return build(data)
+    return cached.get_view(view_name, build)
 
 def get_worksheet(sheet_name):
     """Get a worksheet for direct operations (writes, updates)"""
-    spreadsheet = _get_spreadsheet_instance()
-    return spreadsheet.worksheet(sheet_name)
+    worksheet = _worksheet_cache.get(sheet_name)
+    if worksheet is None:
+        # spreadsheet.worksheet() fetches the spreadsheet metadata on every call
+        worksheet = retry_sheets(lambda: _get_spreadsheet_instance().worksheet(sheet_name))
+        _worksheet_cache[sheet_name] = worksheet
+    return worksheet
+
+
+def refresh_worksheets(sheet_name=None):
+    """Forget resolved worksheet handles, e.g. after sheets are renamed or recreated. If no sheet_name, forgets all."""
+    if sheet_name is None:
+        _worksheet_cache.clear()
+    else:
+        _worksheet_cache.pop(sheet_name, None)
+
+
+def get_header_index(sheet_name, refresh=False):
+    """
+    Get a sheet's {header name: 1-based column index}.
+    Taken from the header row of the last fetch of the sheet, or read from
+    row 1 when the sheet hasn't been fetched yet, and reused for every write.
+    """
+    header_index = None if refresh else _header_cache.get(sheet_name)
+    if header_index is None:
+        headers = retry_sheets(lambda: get_worksheet(sheet_name).row_values(1))
+        header_index = _build_header_index(headers)
+        _header_cache[sheet_name] = header_index
+    return header_index
+
+
+def invalidate_headers(sheet_name=None):
+    """Forget cached header rows, e.g. after an admin edits a sheet's columns. If no sheet_name, forgets all."""
+    if sheet_name is None:
+        _header_cache.clear()
+    else:
+        _header_cache.pop(sheet_name, None)
 
 
 def invalidate_cache(sheet_name=None):
     """Manually invalidate cache. If no sheet_name, invalidates all."""
     _cache.invalidate(sheet_name)
+    invalidate_headers(sheet_name)
+    if sheet_name is None:
+        refresh_worksheets()
     log_cache_invalidation(sheet_name)
 
 def get_metrics():
@@ -1,63 +1,88 @@
-from datetime import datetime
+import functools
+import re
+from datetime import date, datetime
 
-def find_column_index(worksheet, header_name):
-    """Find the index of a column by its header name"""
-    headers = worksheet.row_values(1)  # Get headers from first row
-    try:
-        return headers.index(header_name) + 1  # Convert to 1-based index
-    except ValueError:
-        return None
+# Leading date of an ISO timestamp (2025-09-17T00:00:00.000Z)
+_ISO_DATE_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})T')
 
 def parse_date_string(date_str):
     """Parse a date string in either ISO or readable format"""
-    if 'T' in str(date_str):
-        # Parse ISO format (2025-09-17T00:00:00.000Z)
-        return datetime.fromisoformat(str(date_str).replace('Z', '+00:00')).date()
+    if type(date_str) is not str:
+        date_str = str(date_str)
+    if len(date_str) > 10 and date_str[10] == 'T':
+        # Parse ISO format (2025-09-17T00:00:00.000Z) - only the date part is
+        # kept, so read it directly instead of building an aware datetime
+        match = _ISO_DATE_RE.match(date_str)
+        if match is None:
+            raise ValueError(f"Invalid ISO date: {date_str!r}")
+        return date(int(match[1]), int(match[2]), int(match[3]))
     else:
         # Parse readable format (September 17, 2025)
-        return datetime.strptime(str(date_str), '%B %d, %Y').date()
+        return datetime.strptime(date_str, '%B %d, %Y').date()
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date(date_str):
+    """Memoized parse_date_string - the same few dates recur on every page. None if unparseable."""
+    text = date_str if type(date_str) is str else str(date_str)
+    if not (len(text) > 10 and text[10] == 'T') and ',' not in text:
+        # Neither format - skip the parse attempt and the exception it would raise
+        return None
+    try:
+        return parse_date_string(text)
+    except ValueError:
+        return None
 
 def dates_match(date1, date2):
     """Check if two dates match, handling different formats"""
     if not date1 or not date2:
         return False
-    
-    try:
-        parsed_date1 = parse_date_string(date1)
-        parsed_date2 = parse_date_string(date2)
-        return parsed_date1 == parsed_date2
-    except:
+    if date1 == date2:
+        return True
+
+    parsed_date1 = _parse_date(date1)
+    parsed_date2 = _parse_date(date2)
+    if parsed_date1 is None or parsed_date2 is None:
         return str(date1) == str(date2)
+    return parsed_date1 == parsed_date2
+
+def date_key(date_str):
+    """Normalize a date for use as a lookup key, so formats that dates_match treats as equal give equal keys"""
+    if not date_str:
+        return None
+    parsed_date = _parse_date(date_str)
+    return str(date_str) if parsed_date is None else parsed_date
+
+# Cell values that count as a checked box, after lowercasing
+_TRUTHY = frozenset({'true', 'yes', '1'})
 
-def find_day_by_date(schedule_data, date_str):
-    """Find schedule entry by date string"""
-    for entry in schedule_data:
-        if dates_match(entry.get('Date'), date_str):
-            return entry
-    return None
+def is_truthy(value):
+    """Check if a sheet cell reads as true (TRUE, yes, 1 or a raw boolean)"""
+    return str(value).lower() in _TRUTHY
 
+@functools.lru_cache(maxsize=2048)
 def date_to_url(date_str):
     """Convert date string to URL-safe format (YYYY-MM-DD)"""
+    text = date_str if isinstance(date_str, str) else str(date_str)
     try:
         # Parse various date formats and convert to YYYY-MM-DD
-        if 'T' in str(date_str):
+        if 'T' in text:
             # ISO format (2025-09-17T00:00:00.000Z)
-            dt = datetime.fromisoformat(str(date_str).replace('Z', '+00:00'))
-        elif ',' in date_str:
+            dt = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        elif ',' in text:
             # "September 17, 2025" format
-            dt = datetime.strptime(date_str, '%B %d, %Y')
+            dt = datetime.strptime(text, '%B %d, %Y')
         else:
             # Try other common formats
             for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y']:
                 try:
-                    dt = datetime.strptime(date_str, fmt)
+                    dt = datetime.strptime(text, fmt)
                     break
                 except ValueError:
                     continue
             else:
                 return date_str  # Return as-is if can't parse
         return dt.strftime('%Y-%m-%d')
-    except:
+    except (ValueError, TypeError):
         return date_str
 
 def url_to_date(url_date):
@@ -65,5 +90,5 @@ def url_to_date(url_date):
     try:
         dt = datetime.strptime(url_date, '%Y-%m-%d')
         return dt.strftime('%B %d, %Y')
-    except:
+    except (ValueError, TypeError):
         return url_date
\ No newline at end of file
@@ -1,19 +1,23 @@
-from flask import render_template, request, redirect, url_for
+from flask import render_template, request, redirect, url_for, jsonify
 from urllib.parse import unquote
 
 from models.data import (
     get_attendance_schedule,
-    get_attendance_totals,
-    get_attendance_entries,
-    get_roster,
-    insert_attendance_entry,
+    get_attendance_day,
+    get_attendance_totals_for_date,
+    get_attendance_totals_for_team,
+    get_attendance_entries_for_team,
+    get_attendance_entries_for_date,
+    get_attendance_entry,
+    get_team_roster,
+    insert_attendance_entries,
     update_attendance_entry,
 )
 from models.fields import (
-    NAME, TEAM, DATE, GROUP,
+    NAME, TEAM, DATE,
     PRESENT, HAS_BIBLE, WEARING_SHIRT, HAS_BOOK, DID_HOMEWORK, HAS_DUES,
 )
-from models.utils import dates_match, find_day_by_date, url_to_date
+from models.utils import dates_match, url_to_date
 
 
 def register_attendance_routes(app):
@@ -21,23 +25,30 @@ def register_attendance_routes(app):
 
     @app.route('/attendance')
     def attendance():
+        # API clients can ask for the schedule as JSON and skip the template
+        wants_json = request.accept_mimetypes.best_match(['text/html', 'application/json']) == 'application/json'
         try:
             schedule_data = get_attendance_schedule()
-            return render_template('attendance.html', schedule_data=schedule_data)
+            if wants_json:
+                response = jsonify(schedule_data)
+            else:
+                response = app.make_response(render_template('attendance.html', schedule_data=schedule_data))
         except Exception as e:
-            return render_template('attendance.html', schedule_data=[], error=str(e))
+            app.logger.warning("Error in attendance: %s", e)
+            if wants_json:
+                response = app.make_response((jsonify(error=str(e)), 500))
+            else:
+                response = app.make_response(render_template('attendance.html', schedule_data=[], error=str(e)))
+        response.vary.add('Accept')
+        return response
 
     @app.route('/attendance/<date_str>')
     def attendance_details(date_str):
         try:
-            schedule_data = get_attendance_schedule()
-
-            display_date = url_to_date(date_str)
-            day_data = find_day_by_date(schedule_data, display_date)
+            day_data = get_attendance_day(url_to_date(date_str))
 
             if day_data:
-                all_totals = get_attendance_totals()
-                date_totals = [row for row in all_totals if row.get(DATE) == day_data.get(DATE)]
+                date_totals = get_attendance_totals_for_date(day_data.get(DATE))
 
                 return render_template('attendance_details.html',
                                      day_data=day_data,
@@ -46,28 +57,34 @@ def register_attendance_routes(app):
             else:
                 return redirect(url_for('attendance'))
         except Exception as e:
+            app.logger.warning("Error in attendance_details: %s", e)
             return redirect(url_for('attendance'))
 
+    # A day's schedule row, team totals and entries in one response, so a
+    # client can drill into teams and kids without a request per page
+    @app.route('/api/attendance/<date_str>')
+    def attendance_day_json(date_str):
+        try:
+            day_data = get_attendance_day(url_to_date(date_str))
+            if not day_data:
+                return jsonify(error='Date not found'), 404
+
+            return jsonify(day=day_data,
+                           totals=get_attendance_totals_for_date(day_data.get(DATE)),
+                           entries=get_attendance_entries_for_date(day_data.get(DATE)))
+        except Exception as e:
+            app.logger.warning("Error in attendance_day_json: %s", e)
+            return jsonify(error=str(e)), 500
+
     @app.route('/attendance/<date_str>/team/<team_name>')
     def team_attendance_details(date_str, team_name):
         try:
-            schedule_data = get_attendance_schedule()
-
-            display_date = url_to_date(date_str)
-            day_data = find_day_by_date(schedule_data, display_date)
+            day_data = get_attendance_day(url_to_date(date_str))
 
             if day_data:
-                all_totals = get_attendance_totals()
+                team_data = get_attendance_totals_for_team(day_data.get(DATE), team_name)
 
-                team_data = next((row for row in all_totals
-                                if row.get(DATE) == day_data.get(DATE)
-                                and row.get(TEAM, '').lower() == team_name.lower()), None)
-
-                all_entries = get_attendance_entries()
-
-                checked_in_kids = [entry for entry in all_entries
-                                 if dates_match(entry.get(DATE), day_data.get(DATE))
-                                 and entry.get(TEAM, '').lower() == team_name.lower()]
+                checked_in_kids = get_attendance_entries_for_team(day_data.get(DATE), team_name)
 
                 return render_template('team_attendance_details.html',
                                      day_data=day_data,
@@ -78,25 +95,18 @@ def register_attendance_routes(app):
             else:
                 return redirect(url_for('attendance'))
         except Exception as e:
+            app.logger.warning("Error in team_attendance_details: %s", e)
             return redirect(url_for('attendance'))
 
     @app.route('/attendance/<date_str>/team/<team_name>/kid/<path:kid_name>')
     def kid_attendance_details(date_str, team_name, kid_name):
         try:
-            schedule_data = get_attendance_schedule()
-
-            display_date = url_to_date(date_str)
-            day_data = find_day_by_date(schedule_data, display_date)
+            day_data = get_attendance_day(url_to_date(date_str))
 
             if day_data:
-                all_entries = get_attendance_entries()
-
                 kid_name = unquote(kid_name)
 
-                kid_entry = next((entry for entry in all_entries
-                                if dates_match(entry.get(DATE), day_data.get(DATE))
-                                and entry.get(TEAM, '').lower() == team_name.lower()
-                                and entry.get(NAME, '').lower() == kid_name.lower()), None)
+                kid_entry = get_attendance_entry(day_data.get(DATE), team_name, kid_name)
 
                 return render_template('kid_attendance_details.html',
                                      day_data=day_data,
@@ -107,19 +117,17 @@ def register_attendance_routes(app):
             else:
                 return redirect(url_for('attendance'))
         except Exception as e:
+            app.logger.warning("Error in kid_attendance_details: %s", e)
             return redirect(url_for('attendance'))
 
     @app.route('/attendance/<date_str>/team/<team_name>/checkin')
     def checkin_form(date_str, team_name):
         try:
-            schedule_data = get_attendance_schedule()
-
-            display_date = url_to_date(date_str)
-            day_data = find_day_by_date(schedule_data, display_date)
+            day_data = get_attendance_day(url_to_date(date_str))
 
             if day_data:
-                roster_data = get_roster()
-                team_kids = [row[NAME] for row in roster_data if row.get(GROUP, '').lower() == team_name.lower()]
+                schedule_data = get_attendance_schedule()
+                team_kids = [row[NAME] for row in get_team_roster(team_name)]
 
                 return render_template('checkin_form.html',
                                      day_data=day_data,
@@ -130,6 +138,7 @@ def register_attendance_routes(app):
             else:
                 return redirect(url_for('attendance'))
         except Exception as e:
+            app.logger.warning("Error in checkin_form: %s", e)
             return redirect(url_for('attendance'))
 
     @app.route('/submit_checkin', methods=['POST'])
@@ -138,8 +147,14 @@ def register_attendance_routes(app):
             date_str = request.form.get('date_str')
             team = request.form.get('team')
 
-            insert_attendance_entry({
-                NAME: request.form.get('name'),
+            names = request.form.getlist('name')
+            if not names:
+                # Nobody selected - nothing to record
+                return redirect(f'/attendance/{date_str}/team/{team}/checkin')
+
+            # The form can check in several kids at once with the same answers
+            entries = [{
+                NAME: name,
                 TEAM: team,
                 DATE: request.form.get('date'),
                 PRESENT: 'present' in request.form,
@@ -148,10 +163,13 @@ def register_attendance_routes(app):
                 HAS_BOOK: 'has_book' in request.form,
                 DID_HOMEWORK: 'did_homework' in request.form,
                 HAS_DUES: 'has_dues' in request.form,
-            })
+            } for name in names]
+
+            insert_attendance_entries(entries)
 
             return redirect(f'/attendance/{date_str}/team/{team}')
         except Exception as e:
+            app.logger.warning("Error in submit_checkin: %s", e)
             return redirect(url_for('attendance'))
 
     @app.route('/edit_attendance', methods=['GET', 'POST'])
@@ -164,9 +182,7 @@ def register_attendance_routes(app):
             team_name = request.form.get('team_name')
             kid_name = request.form.get('kid_name')
 
-            schedule_data = get_attendance_schedule()
-            display_date = url_to_date(date_str)
-            day_data = find_day_by_date(schedule_data, display_date)
+            day_data = get_attendance_day(url_to_date(date_str))
 
             if day_data:
                 entry_date = day_data.get(DATE)
@@ -189,4 +205,5 @@ def register_attendance_routes(app):
 
             return redirect(url_for('attendance'))
         except Exception as e:
+            app.logger.warning("Error in edit_kid_attendance: %s", e)
             return redirect(url_for('attendance'))
@@ -4,18 +4,20 @@ from urllib.parse import unquote
 from flask import render_template, request, redirect, url_for
 
 from models.fields import (
-    NAME, TEAM, DATE, GROUP, SECTION,
+    NAME, TEAM, DATE, SECTION,
     SECTION_COMPLETE, SILVER_CREDIT, GOLD_CREDIT,
 )
 from models.data import (
     get_schedule,
-    get_roster,
-    get_weekly_totals,
-    get_completed_sections,
+    get_schedule_day,
+    get_team_roster,
+    get_weekly_totals_for_date,
+    get_weekly_totals_for_team,
+    get_completed_sections_for_team,
     insert_completed_section,
     update_completed_section,
 )
-from models.utils import dates_match, find_day_by_date, url_to_date
+from models.utils import dates_match, url_to_date
 
 
 def register_home_routes(app):
@@ -27,19 +29,16 @@ def register_home_routes(app):
             schedule_data = get_schedule()
             return render_template('home.html', schedule_data=schedule_data)
         except Exception as e:
+            app.logger.warning("Error in home: %s", e)
             return render_template('home.html', schedule_data=[], error=str(e))
 
     @app.route('/home/<date_str>')
     def home_details(date_str):
         try:
-            schedule_data = get_schedule()
-
-            display_date = url_to_date(date_str)
-            day_data = find_day_by_date(schedule_data, display_date)
+            day_data = get_schedule_day(url_to_date(date_str))
 
             if day_data:
-                all_totals = get_weekly_totals()
-                date_totals = [row for row in all_totals if row.get(DATE) == day_data.get(DATE)]
+                date_totals = get_weekly_totals_for_date(day_data.get(DATE))
 
                 return render_template('home_details.html',
                                      day_data=day_data,
@@ -48,28 +47,18 @@ def register_home_routes(app):
             else:
                 return redirect(url_for('home'))
         except Exception as e:
+            app.logger.warning("Error in home_details: %s", e)
             return redirect(url_for('home'))
 
     @app.route('/home/<date_str>/team/<team_name>')
     def home_team_details(date_str, team_name):
         try:
-            schedule_data = get_schedule()
-
-            display_date = url_to_date(date_str)
-            day_data = find_day_by_date(schedule_data, display_date)
+            day_data = get_schedule_day(url_to_date(date_str))
 
             if day_data:
-                all_totals = get_weekly_totals()
-
-                team_data = next((row for row in all_totals
-                                if row.get(DATE) == day_data.get(DATE)
-                                and row.get(TEAM, '').lower() == team_name.lower()), None)
-
-                all_sections = get_completed_sections()
+                team_data = get_weekly_totals_for_team(day_data.get(DATE), team_name)
 
-                team_sections = [entry for entry in all_sections
-                               if dates_match(entry.get(DATE), day_data.get(DATE))
-                               and entry.get(TEAM, '').lower() == team_name.lower()]
+                team_sections = get_completed_sections_for_team(day_data.get(DATE), team_name)
 
                 kids_sections = defaultdict(list)
                 for section in team_sections:
@@ -86,19 +75,17 @@ def register_home_routes(app):
             else:
                 return redirect(url_for('home'))
         except Exception as e:
+            app.logger.warning("Error in home_team_details: %s", e)
             return redirect(url_for('home'))
 
     @app.route('/home/<date_str>/team/<team_name>/record_section')
     def record_section_form(date_str, team_name):
         try:
-            schedule_data = get_schedule()
-
-            display_date = url_to_date(date_str)
-            day_data = find_day_by_date(schedule_data, display_date)
+            day_data = get_schedule_day(url_to_date(date_str))
 
             if day_data:
-                roster_data = get_roster()
-                team_kids = [row[NAME] for row in roster_data if row.get(GROUP, '').lower() == team_name.lower()]
+                schedule_data = get_schedule()
+                team_kids = [row[NAME] for row in get_team_roster(team_name)]
 
                 return render_template('record_section_form.html',
                                      day_data=day_data,
@@ -109,26 +96,21 @@ def register_home_routes(app):
             else:
                 return redirect(url_for('home'))
         except Exception as e:
+            app.logger.warning("Error in record_section_form: %s", e)
             return redirect(url_for('home'))
 
     @app.route('/home/<date_str>/team/<team_name>/kid/<path:kid_name>/section/<path:section_name>')
     def home_section_details(date_str, team_name, kid_name, section_name):
         try:
-            schedule_data = get_schedule()
-
-            display_date = url_to_date(date_str)
-            day_data = find_day_by_date(schedule_data, display_date)
+            day_data = get_schedule_day(url_to_date(date_str))
 
             if day_data:
-                all_sections = get_completed_sections()
-
                 kid_name = unquote(kid_name)
                 section_name = unquote(section_name)
 
-                section_entry = next((entry for entry in all_sections
-                                    if dates_match(entry.get(DATE), day_data.get(DATE))
-                                    and entry.get(TEAM, '').lower() == team_name.lower()
-                                    and entry.get(NAME, '').lower() == kid_name.lower()
+                team_sections = get_completed_sections_for_team(day_data.get(DATE), team_name)
+                section_entry = next((entry for entry in team_sections
+                                    if entry.get(NAME, '').lower() == kid_name.lower()
                                     and str(entry.get(SECTION, '')) == str(section_name)), None)
 
                 return render_template('home_section_details.html',
@@ -141,7 +123,7 @@ def register_home_routes(app):
             else:
                 return redirect(url_for('home'))
         except Exception as e:
-            print(f"Error in home_section_details: {e}")
+            app.logger.warning("Error in home_section_details: %s", e)
             return redirect(url_for('home'))
 
     @app.route('/submit_section', methods=['POST'])
@@ -162,6 +144,7 @@ def register_home_routes(app):
 
             return redirect(f'/home/{date_str}/team/{team}')
         except Exception as e:
+            app.logger.warning("Error in submit_section: %s", e)
             return redirect(url_for('home'))
 
     @app.route('/edit_section', methods=['GET', 'POST'])
@@ -175,9 +158,7 @@ def register_home_routes(app):
             kid_name = request.form.get('kid_name')
             section_name = request.form.get('section_name')
 
-            schedule_data = get_schedule()
-            display_date = url_to_date(date_str)
-            day_data = find_day_by_date(schedule_data, display_date)
+            day_data = get_schedule_day(url_to_date(date_str))
 
             if day_data:
                 entry_date = day_data.get(DATE)
@@ -198,4 +179,5 @@ def register_home_routes(app):
 
             return redirect(url_for('home'))
         except Exception as e:
+            app.logger.warning("Error in edit_section: %s", e)
             return redirect(url_for('home'))
@@ -3,7 +3,9 @@ from urllib.parse import unquote
 
 from models.data import (
     get_roster,
-    get_completed_sections,
+    get_student,
+    get_completed_sections_for_student,
+    get_student_credit_counts,
     update_completed_section,
 )
 from models.fields import NAME, DATE, SECTION, SECTION_COMPLETE, SILVER_CREDIT, GOLD_CREDIT
@@ -18,6 +20,7 @@ def register_progress_routes(app):
             roster_data = get_roster()
             return render_template('progress.html', students=roster_data)
         except Exception as e:
+            app.logger.warning("Error in progress: %s", e)
             return render_template('progress.html', students=[], error=str(e))
 
     @app.route('/progress/student/<path:student_name>')
@@ -25,25 +28,19 @@ def register_progress_routes(app):
         try:
             student_name = unquote(student_name)
 
-            roster_data = get_roster()
-            student_info = next((student for student in roster_data if student.get(NAME, '').lower() == student_name.lower()), None)
-
-            all_sections = get_completed_sections()
-
-            student_sections = [section for section in all_sections if section.get(NAME, '').lower() == student_name.lower()]
-
-            total_sections = len(student_sections)
-            silver_earned = sum(1 for section in student_sections if str(section.get(SILVER_CREDIT, '')).lower() in ['true', 'yes', '1'])
-            gold_earned = sum(1 for section in student_sections if str(section.get(GOLD_CREDIT, '')).lower() in ['true', 'yes', '1'])
+            student_info = get_student(student_name)
+            student_sections = get_completed_sections_for_student(student_name)
+            credit_counts = get_student_credit_counts(student_name)
 
             return render_template('student_progress.html',
                                  student_name=student_name,
                                  student_info=student_info,
                                  student_sections=student_sections,
-                                 total_sections=total_sections,
-                                 silver_earned=silver_earned,
-                                 gold_earned=gold_earned)
+                                 total_sections=credit_counts['total'],
+                                 silver_earned=credit_counts['silver'],
+                                 gold_earned=credit_counts['gold'])
         except Exception as e:
+            app.logger.warning("Error in student_progress: %s", e)
             return redirect(url_for('progress'))
 
     @app.route('/progress/student/<path:student_name>/section/<int:section_index>')
@@ -51,9 +48,7 @@ def register_progress_routes(app):
         try:
             student_name = unquote(student_name)
 
-            all_sections = get_completed_sections()
-
-            student_sections = [section for section in all_sections if section.get(NAME, '').lower() == student_name.lower()]
+            student_sections = get_completed_sections_for_student(student_name)
 
             if 0 <= section_index < len(student_sections):
                 section_entry = student_sections[section_index]
@@ -65,6 +60,7 @@ def register_progress_routes(app):
             else:
                 return redirect(f'/progress/student/{student_name}')
         except Exception as e:
+            app.logger.warning("Error in student_section_details: %s", e)
             return redirect(url_for('progress'))
 
     @app.route('/edit_progress_section', methods=['GET', 'POST'])
@@ -76,8 +72,7 @@ def register_progress_routes(app):
             student_name = request.form.get('student_name')
             section_index = int(request.form.get('section_index'))
 
-            all_sections = get_completed_sections()
-            student_sections = [s for s in all_sections if s.get(NAME, '').lower() == student_name.lower()]
+            student_sections = get_completed_sections_for_student(student_name)
 
             if 0 <= section_index < len(student_sections):
                 target = student_sections[section_index]
@@ -99,4 +94,5 @@ def register_progress_routes(app):
 
             return redirect(url_for('progress'))
         except Exception as e:
+            app.logger.warning("Error in edit_progress_section: %s", e)
             return redirect(url_for('progress'))
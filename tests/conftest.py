@@ -0,0 +1,70 @@
+import importlib.abc
+import importlib.machinery
+import sys
+import types
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+# Google client packages replaced by stubs for the whole test session
+STUBBED_PACKAGES = ('gspread', 'oauth2client')
+
+
+class _StubModule(types.ModuleType):
+    """Module whose every missing public attribute is a MagicMock"""
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        value = MagicMock(name=f'{self.__name__}.{name}')
+        setattr(self, name, value)
+        return value
+
+
+class _StubFinder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    """Import hook that serves stub modules for the given packages and their submodules"""
+
+    def __init__(self, packages):
+        self.packages = tuple(packages)
+
+    def _is_stubbed(self, fullname):
+        return any(fullname == pkg or fullname.startswith(pkg + '.') for pkg in self.packages)
+
+    def find_spec(self, fullname, path, target=None):
+        if self._is_stubbed(fullname):
+            return importlib.machinery.ModuleSpec(fullname, self, is_package=True)
+        return None
+
+    def create_module(self, spec):
+        return _StubModule(spec.name)
+
+    def exec_module(self, module):
+        pass
+
+
+# Install the hook ahead of the real packages, dropping any already imported
+_stub_finder = _StubFinder(STUBBED_PACKAGES)
+for _name in [name for name in sys.modules if _stub_finder._is_stubbed(name)]:
+    del sys.modules[_name]
+sys.meta_path.insert(0, _stub_finder)
+
+# Import the app once for the whole session; tests get it through the app fixture
+with patch.dict('os.environ', {'GOOGLE_SHEETS_CREDS': '{}'}):
+    from tnt import app as _app
+
+
+@pytest.fixture(scope='session')
+def app():
+    """The Flask app shared across the test session"""
+    return _app
+
+
+@pytest.fixture(scope='class')
+def client(request, app):
+    """One test client per test class, kept open as a context manager"""
+    app.config['TESTING'] = True
+    with app.test_client() as test_client:
+        if request.cls is not None:
+            request.cls.app = app
+            request.cls.client = test_client
+        yield test_client
@@ -0,0 +1,8 @@
+import unittest
+
+import pytest
+
+
+@pytest.mark.usefixtures('client')
+class ClientTestCase(unittest.TestCase):
+    """Base for test classes that share the class-scoped app and client fixtures"""
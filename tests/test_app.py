@@ -0,0 +1,93 @@
+import unittest
+from unittest.mock import patch
+
+from tests.helpers import ClientTestCase
+
+
+class TestMetricsRoute(ClientTestCase):
+    """Tests for the /metrics endpoint"""
+
+    @patch('tnt.get_metrics', return_value={'cache_hits': 1})
+    def test_metrics_sets_etag(self, mock_get_metrics):
+        """GET /metrics should send an ETag and a short Cache-Control"""
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.get_etag()[0])
+        self.assertIn('max-age=10', response.headers['Cache-Control'])
+
+    @patch('tnt.get_metrics', return_value={'cache_hits': 1})
+    def test_metrics_not_modified(self, mock_get_metrics):
+        """A matching If-None-Match should get an empty 304"""
+        etag = self.client.get('/metrics').get_etag()[0]
+
+        response = self.client.get('/metrics', headers={'If-None-Match': f'"{etag}"'})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b'')
+
+
+class TestCompression(ClientTestCase):
+    """Tests for response compression"""
+
+    @patch('routes.home.get_schedule')
+    def test_pages_gzipped(self, mock_get_schedule):
+        """HTML pages should be gzipped when the client accepts it"""
+        mock_get_schedule.return_value = [
+            {'Date': f'January {day}, 2025', 'Theme': 'Test Theme'} for day in range(1, 29)
+        ]
+
+        response = self.client.get('/', headers={'Accept-Encoding': 'gzip'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+
+
+class TestPageETags(ClientTestCase):
+    """Tests for conditional GETs on HTML pages"""
+
+    SCHEDULE = [{'Date': f'January {day}, 2025', 'Theme': 'Test Theme'} for day in range(1, 29)]
+
+    @patch('routes.home.get_schedule', return_value=SCHEDULE)
+    def test_page_not_modified(self, mock_get_schedule):
+        """A page whose ETag matches should get an empty 304"""
+        first = self.client.get('/')
+        self.assertEqual(first.headers['Cache-Control'], 'no-cache')
+
+        response = self.client.get('/', headers={'If-None-Match': first.headers['ETag']})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b'')
+
+    @patch('routes.home.get_schedule', return_value=SCHEDULE)
+    def test_gzipped_page_not_modified(self, mock_get_schedule):
+        """The ETag of a gzipped page should also revalidate"""
+        headers = {'Accept-Encoding': 'gzip'}
+        etag = self.client.get('/', headers=headers).headers['ETag']
+
+        response = self.client.get('/', headers={**headers, 'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+
+
+class TestStaticFiles(ClientTestCase):
+    """Tests for static file caching"""
+
+    def test_static_url_is_versioned(self):
+        """static_url should add a content hash to the URL"""
+        with self.app.test_request_context():
+            url = self.app.jinja_env.globals['static_url']('style.css')
+
+        self.assertTrue(url.startswith('/static/style.css?v='))
+
+    def test_static_files_cached_long(self):
+        """Static files should be sent with a long max-age"""
+        response = self.client.get('/static/style.css')
+        response.close()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.cache_control.max_age, 31536000)
+
+
+if __name__ == '__main__':
+    unittest.main()
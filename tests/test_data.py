@@ -0,0 +1,173 @@
+import unittest
+from unittest.mock import patch
+
+
+class TestTeamLookups(unittest.TestCase):
+    """Tests for the per-team record lookups"""
+
+    ENTRIES = [
+        {'Date': 'January 15, 2025', 'Team': 'Red', 'Name': 'Alice'},
+        {'Date': '2025-01-15T00:00:00.000Z', 'Team': 'red', 'Name': 'Bob'},
+        {'Date': 'January 15, 2025', 'Team': 'Blue', 'Name': 'Cara'},
+        {'Date': 'January 22, 2025', 'Team': 'Red', 'Name': 'Dan'},
+    ]
+
+    def setUp(self):
+        patcher = patch('models.data._get_sheet_view',
+                        side_effect=lambda sheet, name, build: build(self.ENTRIES))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_matches_date_formats_and_team_case(self):
+        """Should match dates across formats and team names case-insensitively"""
+        from models.data import get_attendance_entries_for_team
+
+        entries = get_attendance_entries_for_team('January 15, 2025', 'RED')
+
+        self.assertEqual([entry['Name'] for entry in entries], ['Alice', 'Bob'])
+
+    def test_entries_for_date_cover_every_team(self):
+        """Should return every team's entries for the date"""
+        from models.data import get_attendance_entries_for_date
+
+        entries = get_attendance_entries_for_date('2025-01-15T00:00:00.000Z')
+
+        self.assertEqual([entry['Name'] for entry in entries], ['Alice', 'Bob', 'Cara'])
+
+    def test_no_match_returns_empty(self):
+        """Should return an empty list when nothing matches"""
+        from models.data import get_completed_sections_for_team
+
+        self.assertEqual(get_completed_sections_for_team('January 15, 2025', 'Green'), [])
+
+
+class TestStudentLookup(unittest.TestCase):
+    """Tests for the per-student section lookups"""
+
+    SECTIONS = [
+        {'Name': 'Alice', 'Section': '1.1'},
+        {'Name': 'Bob', 'Section': '1.1'},
+        {'Name': 'alice', 'Section': '1.2'},
+    ]
+
+    @patch('models.data._get_sheet_view')
+    def test_matches_name_case_insensitively(self, mock_get_view):
+        """Should return the student's sections in sheet order, ignoring name case"""
+        from models.data import get_completed_sections_for_student
+        mock_get_view.side_effect = lambda sheet, name, build: build(self.SECTIONS)
+
+        sections = get_completed_sections_for_student('ALICE')
+
+        self.assertEqual([section['Section'] for section in sections], ['1.1', '1.2'])
+
+    @patch('models.data._get_sheet_view')
+    def test_credit_counts(self, mock_get_view):
+        """Should count a student's sections and truthy silver/gold credits"""
+        from models.data import get_student_credit_counts
+        sections = [
+            {'Name': 'Alice', 'Silver Credit': True, 'Gold Credit': 'FALSE'},
+            {'Name': 'alice', 'Silver Credit': 'yes', 'Gold Credit': 'TRUE'},
+            {'Name': 'Bob', 'Silver Credit': 'TRUE', 'Gold Credit': 'TRUE'},
+        ]
+        mock_get_view.side_effect = lambda sheet, name, build: build(sections)
+
+        self.assertEqual(get_student_credit_counts('ALICE'), {'total': 2, 'silver': 2, 'gold': 1})
+        self.assertEqual(get_student_credit_counts('Cara'), {'total': 0, 'silver': 0, 'gold': 0})
+
+
+class TestDateLookup(unittest.TestCase):
+    """Tests for the per-date totals lookups"""
+
+    TOTALS = [
+        {'Date': 'January 15, 2025', 'Team': 'Red', 'Total': 10},
+        {'Date': 'January 15, 2025', 'Team': 'Blue', 'Total': 7},
+        {'Date': 'January 22, 2025', 'Team': 'Red', 'Total': 4},
+    ]
+
+    @patch('models.data._get_sheet_view')
+    def test_returns_every_team_for_date(self, mock_get_view):
+        """Should return all teams' totals for the date, accepting other date formats"""
+        from models.data import get_weekly_totals_for_date
+        mock_get_view.side_effect = lambda sheet, name, build: build(self.TOTALS)
+
+        totals = get_weekly_totals_for_date('2025-01-15T00:00:00.000Z')
+
+        self.assertEqual([row['Team'] for row in totals], ['Red', 'Blue'])
+
+    @patch('models.data._get_sheet_view')
+    def test_team_totals_row(self, mock_get_view):
+        """Should return the team's totals row for the date, or None"""
+        from models.data import get_weekly_totals_for_team
+        mock_get_view.side_effect = lambda sheet, name, build: build(self.TOTALS)
+
+        self.assertEqual(get_weekly_totals_for_team('January 22, 2025', 'red')['Total'], 4)
+        self.assertIsNone(get_weekly_totals_for_team('January 22, 2025', 'Blue'))
+
+
+class TestScheduleDayLookup(unittest.TestCase):
+    """Tests for get_schedule_day() and get_attendance_day()"""
+
+    SCHEDULE = [
+        {'Date': 'January 15, 2025', 'Theme': 'Week 1'},
+        {'Date': '2025-01-22T00:00:00.000Z', 'Theme': 'Week 2'},
+    ]
+
+    @patch('models.data._get_sheet_view')
+    def test_finds_day_across_date_formats(self, mock_get_view):
+        """Should return the schedule row for a date in either format, or None"""
+        from models.data import get_schedule_day, get_attendance_day
+        mock_get_view.side_effect = lambda sheet, name, build: build(self.SCHEDULE)
+
+        self.assertEqual(get_schedule_day('January 22, 2025')['Theme'], 'Week 2')
+        self.assertEqual(get_attendance_day('2025-01-15T00:00:00.000Z')['Theme'], 'Week 1')
+        self.assertIsNone(get_schedule_day('January 29, 2025'))
+
+
+class TestKidLookup(unittest.TestCase):
+    """Tests for get_attendance_entry()"""
+
+    ENTRIES = [
+        {'Date': 'January 15, 2025', 'Team': 'Red', 'Name': 'Alice', 'Present': 'TRUE'},
+        {'Date': 'January 15, 2025', 'Team': 'Red', 'Name': 'Alice', 'Present': 'FALSE'},
+        {'Date': 'January 15, 2025', 'Team': 'Blue', 'Name': 'Bob', 'Present': 'TRUE'},
+    ]
+
+    @patch('models.data._get_sheet_view')
+    def test_returns_first_matching_entry(self, mock_get_view):
+        """Should return the kid's first entry for the date and team, ignoring case"""
+        from models.data import get_attendance_entry
+        mock_get_view.side_effect = lambda sheet, name, build: build(self.ENTRIES)
+
+        entry = get_attendance_entry('January 15, 2025', 'RED', 'alice')
+
+        self.assertIs(entry, self.ENTRIES[0])
+        self.assertIsNone(get_attendance_entry('January 15, 2025', 'Red', 'Bob'))
+
+
+class TestStudentRosterLookup(unittest.TestCase):
+    """Tests for get_student()"""
+
+    @patch('models.data._get_sheet_view')
+    def test_finds_student_by_name(self, mock_get_view):
+        """Should return the roster row for a name, ignoring case"""
+        from models.data import get_student
+        roster = [{'Name': 'Alice', 'Group': 'Red'}, {'Name': 'Bob', 'Group': 'Blue'}]
+        mock_get_view.side_effect = lambda sheet, name, build: build(roster)
+
+        self.assertEqual(get_student('bob')['Group'], 'Blue')
+        self.assertIsNone(get_student('Cara'))
+
+    @patch('models.data._get_sheet_view')
+    def test_team_roster(self, mock_get_view):
+        """Should return the roster rows for a team, ignoring case"""
+        from models.data import get_team_roster
+        roster = [{'Name': 'Alice', 'Group': 'Red'}, {'Name': 'Bob', 'Group': 'Blue'},
+                  {'Name': 'Cara', 'Group': 'red'}]
+        mock_get_view.side_effect = lambda sheet, name, build: build(roster)
+
+        self.assertEqual([row['Name'] for row in get_team_roster('RED')], ['Alice', 'Cara'])
+        self.assertEqual(get_team_roster('Green'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
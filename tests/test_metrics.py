@@ -68,6 +68,22 @@ class TestLogRateLimitError(unittest.TestCase):
         self.assertEqual(metrics_module._metrics['rate_limit_errors'], 1)
 
 
+class TestLogWriteFailure(unittest.TestCase):
+    """Tests for log_write_failure()"""
+
+    def setUp(self):
+        metrics_module.reset_metrics()
+
+    def tearDown(self):
+        metrics_module.reset_metrics()
+
+    def test_counts_failed_rows(self):
+        """Should add the failed write's rows to failed_write_rows"""
+        metrics_module.log_write_failure('Test Sheet', 3, Exception('boom'), requeued=True)
+        metrics_module.log_write_failure('Test Sheet', 1, Exception('boom'))
+        self.assertEqual(metrics_module._metrics['failed_write_rows'], 4)
+
+
 class TestResetMetrics(unittest.TestCase):
     """Tests for reset_metrics()"""
 
@@ -79,6 +95,7 @@ class TestResetMetrics(unittest.TestCase):
         metrics_module.log_api_call('read', 'Test', source='google')
         metrics_module.log_api_call('read', 'Test', source='google-bg')
         metrics_module.log_rate_limit_error('Test')
+        metrics_module.log_write_failure('Test', 2, Exception('boom'))
 
         metrics_module.reset_metrics()
 
@@ -90,6 +107,7 @@ class TestResetMetrics(unittest.TestCase):
         self.assertEqual(metrics_module._metrics['total_writes'], 0)
         self.assertEqual(metrics_module._metrics['total_bytes'], 0)
         self.assertEqual(metrics_module._metrics['rate_limit_errors'], 0)
+        self.assertEqual(metrics_module._metrics['failed_write_rows'], 0)
         self.assertEqual(len(metrics_module._metrics['recent_calls']), 0)
 
 
@@ -110,6 +128,7 @@ class TestGetMetrics(unittest.TestCase):
             'total_google_reads', 'total_writes', 'total_bytes',
             'cache_hits', 'cache_hits_stale', 'cache_misses',
             'background_refreshes', 'cache_hit_rate', 'rate_limit_errors',
+            'failed_write_rows',
         ]
         for field in expected_fields:
             with self.subTest(field=field):
@@ -1,24 +1,13 @@
-import sys
 import unittest
+from urllib.parse import urlparse
 from unittest.mock import patch, MagicMock
 
-# Mock gspread before importing routes
-sys.modules['gspread'] = MagicMock()
-sys.modules['gspread.exceptions'] = MagicMock()
-sys.modules['oauth2client'] = MagicMock()
-sys.modules['oauth2client.service_account'] = MagicMock()
+from tests.helpers import ClientTestCase
 
-with patch.dict('os.environ', {'GOOGLE_SHEETS_CREDS': '{}'}):
-    from tnt import app
 
-
-class TestAttendanceRoutes(unittest.TestCase):
+class TestAttendanceRoutes(ClientTestCase):
     """Tests for attendance route handlers"""
 
-    def setUp(self):
-        app.config['TESTING'] = True
-        self.client = app.test_client()
-
     @patch('routes.attendance.get_attendance_schedule')
     def test_attendance_returns_schedule_data(self, mock_get_schedule):
         """GET /attendance should return attendance schedule data"""
@@ -39,23 +28,31 @@ class TestAttendanceRoutes(unittest.TestCase):
         response = self.client.get('/attendance')
 
         self.assertEqual(response.status_code, 200)
-        self.assertIn(b'Sheet not found', response.data)
-
-
-class TestAttendanceDetailsRoutes(unittest.TestCase):
-    """Tests for attendance details route"""
-
-    def setUp(self):
-        app.config['TESTING'] = True
-        self.client = app.test_client()
+        body = response.get_data()
+        self.assertIn(b'Sheet not found', body)
 
-    @patch('routes.attendance.get_attendance_totals')
     @patch('routes.attendance.get_attendance_schedule')
-    def test_attendance_details_shows_day_data(self, mock_get_schedule, mock_get_totals):
-        """GET /attendance/<date_str> should show day details"""
+    def test_attendance_json(self, mock_get_schedule):
+        """GET /attendance should return the schedule as JSON when the client asks for it"""
         mock_get_schedule.return_value = [
             {'Date': 'January 15, 2025', 'Theme': 'Test Theme'}
         ]
+
+        response = self.client.get('/attendance', headers={'Accept': 'application/json'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), mock_get_schedule.return_value)
+        self.assertIn('Accept', response.vary)
+
+
+class TestAttendanceDetailsRoutes(ClientTestCase):
+    """Tests for attendance details route"""
+
+    @patch('routes.attendance.get_attendance_totals_for_date')
+    @patch('routes.attendance.get_attendance_day')
+    def test_attendance_details_shows_day_data(self, mock_get_day, mock_get_totals):
+        """GET /attendance/<date_str> should show day details"""
+        mock_get_day.return_value = {'Date': 'January 15, 2025', 'Theme': 'Test Theme'}
         mock_get_totals.return_value = [
             {'Date': 'January 15, 2025', 'Team': 'Red', 'Present': 5}
         ]
@@ -63,46 +60,110 @@ class TestAttendanceDetailsRoutes(unittest.TestCase):
         response = self.client.get('/attendance/2025-01-15')
 
         self.assertEqual(response.status_code, 200)
+        mock_get_totals.assert_called_once_with('January 15, 2025')
 
-    @patch('routes.attendance.get_attendance_schedule')
-    def test_attendance_details_redirects_if_date_not_found(self, mock_get_schedule):
+    def test_attendance_details_shows_formatted_cells(self):
+        """Formatted schedule and totals cells should render as the sheet shows them"""
+        from models import sheets
+
+        def values_batch_get(ranges, params):
+            # Google returns the display string only when asked for formatted values
+            percent = '85%' if params['valueRenderOption'] == 'FORMATTED_VALUE' else 0.85
+            return {'valueRanges': [
+                {'values': [['Date', 'Theme', 'Goal'], ['January 15, 2025', 'Space', percent]]},
+                {'values': [['Date', 'Team', 'Kids Present'], ['January 15, 2025', 'Red', percent]]},
+            ]}
+
+        spreadsheet = MagicMock()
+        spreadsheet.values_batch_get.side_effect = values_batch_get
+        sheets._cache.clear()
+        self.addCleanup(sheets._cache.clear)
+
+        with patch('models.sheets._get_spreadsheet_instance', return_value=spreadsheet):
+            response = self.client.get('/attendance/2025-01-15')
+
+        body = response.get_data(as_text=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('85%', body)
+        self.assertIn('Kids Present - 85%', body)
+        self.assertNotIn('0.85', body)
+
+    @patch('routes.attendance.get_attendance_totals_for_date')
+    @patch('routes.attendance.get_attendance_day')
+    def test_attendance_details_redirects_if_date_not_found(self, mock_get_day, mock_get_totals):
         """GET /attendance/<date_str> should redirect if date not in schedule"""
-        mock_get_schedule.return_value = [
-            {'Date': 'January 15, 2025', 'Theme': 'Test Theme'}
-        ]
+        mock_get_day.return_value = None
 
         response = self.client.get('/attendance/2025-12-31')
 
         self.assertEqual(response.status_code, 302)
+        self.assertEqual(urlparse(response.location).path, '/attendance')
+        mock_get_totals.assert_not_called()
 
-    @patch('routes.attendance.get_attendance_schedule')
-    def test_attendance_details_handles_error(self, mock_get_schedule):
+    @patch('routes.attendance.get_attendance_totals_for_date')
+    @patch('routes.attendance.get_attendance_day')
+    def test_attendance_details_redirects_if_totals_fail(self, mock_get_day, mock_get_totals):
+        """GET /attendance/<date_str> should redirect when reading the totals fails"""
+        mock_get_day.return_value = {'Date': 'January 15, 2025', 'Theme': 'Test Theme'}
+        mock_get_totals.side_effect = Exception('Error')
+
+        response = self.client.get('/attendance/2025-01-15')
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(urlparse(response.location).path, '/attendance')
+
+    @patch('routes.attendance.get_attendance_day')
+    def test_attendance_details_handles_error(self, mock_get_day):
         """GET /attendance/<date_str> should redirect on error"""
-        mock_get_schedule.side_effect = Exception('Error')
+        mock_get_day.side_effect = Exception('Error')
 
         response = self.client.get('/attendance/2025-01-15')
 
         self.assertEqual(response.status_code, 302)
 
 
-class TestTeamAttendanceDetailsRoutes(unittest.TestCase):
-    """Tests for team attendance details route"""
+class TestAttendanceDayJsonRoutes(ClientTestCase):
+    """Tests for the attendance day JSON endpoint"""
 
-    def setUp(self):
-        app.config['TESTING'] = True
-        self.client = app.test_client()
+    @patch('routes.attendance.get_attendance_entries_for_date')
+    @patch('routes.attendance.get_attendance_totals_for_date')
+    @patch('routes.attendance.get_attendance_day')
+    def test_day_json_returns_day_totals_and_entries(self, mock_get_day, mock_get_totals, mock_get_entries):
+        """GET /api/attendance/<date> should return the day's data as JSON"""
+        mock_get_day.return_value = {'Date': 'January 15, 2025', 'Theme': 'Test'}
+        mock_get_totals.return_value = [{'Date': 'January 15, 2025', 'Team': 'Red', 'Present': 5}]
+        mock_get_entries.return_value = [{'Date': 'January 15, 2025', 'Team': 'Red', 'Name': 'Alice'}]
 
-    @patch('routes.attendance.get_attendance_entries')
-    @patch('routes.attendance.get_attendance_totals')
-    @patch('routes.attendance.get_attendance_schedule')
-    def test_team_attendance_shows_team_data(self, mock_get_schedule, mock_get_totals, mock_get_entries):
+        response = self.client.get('/api/attendance/2025-01-15')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {
+            'day': mock_get_day.return_value,
+            'totals': mock_get_totals.return_value,
+            'entries': mock_get_entries.return_value,
+        })
+        mock_get_entries.assert_called_once_with('January 15, 2025')
+
+    @patch('routes.attendance.get_attendance_day')
+    def test_day_json_not_found(self, mock_get_day):
+        """Should return 404 if date not in schedule"""
+        mock_get_day.return_value = None
+
+        response = self.client.get('/api/attendance/2025-12-31')
+
+        self.assertEqual(response.status_code, 404)
+
+
+class TestTeamAttendanceDetailsRoutes(ClientTestCase):
+    """Tests for team attendance details route"""
+
+    @patch('routes.attendance.get_attendance_entries_for_team')
+    @patch('routes.attendance.get_attendance_totals_for_team')
+    @patch('routes.attendance.get_attendance_day')
+    def test_team_attendance_shows_team_data(self, mock_get_day, mock_get_totals, mock_get_entries):
         """GET /attendance/<date>/team/<team> should show team attendance"""
-        mock_get_schedule.return_value = [
-            {'Date': 'January 15, 2025', 'Theme': 'Test'}
-        ]
-        mock_get_totals.return_value = [
-            {'Date': 'January 15, 2025', 'Team': 'Red', 'Present': 5}
-        ]
+        mock_get_day.return_value = {'Date': 'January 15, 2025', 'Theme': 'Test'}
+        mock_get_totals.return_value = {'Date': 'January 15, 2025', 'Team': 'Red', 'Present': 5}
         mock_get_entries.return_value = [
             {'Date': 'January 15, 2025', 'Team': 'Red', 'Name': 'Alice', 'Present': True}
         ]
@@ -110,96 +171,80 @@ class TestTeamAttendanceDetailsRoutes(unittest.TestCase):
         response = self.client.get('/attendance/2025-01-15/team/Red')
 
         self.assertEqual(response.status_code, 200)
+        mock_get_entries.assert_called_once_with('January 15, 2025', 'Red')
 
-    @patch('routes.attendance.get_attendance_schedule')
-    def test_team_attendance_redirects_if_date_not_found(self, mock_get_schedule):
+    @patch('routes.attendance.get_attendance_day')
+    def test_team_attendance_redirects_if_date_not_found(self, mock_get_day):
         """Should redirect if date not in schedule"""
-        mock_get_schedule.return_value = []
+        mock_get_day.return_value = None
 
         response = self.client.get('/attendance/2025-01-15/team/Red')
 
         self.assertEqual(response.status_code, 302)
 
 
-class TestKidAttendanceDetailsRoutes(unittest.TestCase):
+class TestKidAttendanceDetailsRoutes(ClientTestCase):
     """Tests for kid attendance details route"""
 
-    def setUp(self):
-        app.config['TESTING'] = True
-        self.client = app.test_client()
-
-    @patch('routes.attendance.get_attendance_entries')
-    @patch('routes.attendance.get_attendance_schedule')
-    def test_kid_attendance_shows_entry(self, mock_get_schedule, mock_get_entries):
+    @patch('routes.attendance.get_attendance_entry')
+    @patch('routes.attendance.get_attendance_day')
+    def test_kid_attendance_shows_entry(self, mock_get_day, mock_get_entry):
         """GET /attendance/<date>/team/<team>/kid/<kid> should show kid entry"""
-        mock_get_schedule.return_value = [
-            {'Date': 'January 15, 2025', 'Theme': 'Test'}
-        ]
-        mock_get_entries.return_value = [
-            {'Date': 'January 15, 2025', 'Team': 'Red', 'Name': 'Alice', 'Present': True}
-        ]
+        mock_get_day.return_value = {'Date': 'January 15, 2025', 'Theme': 'Test'}
+        mock_get_entry.return_value = {'Date': 'January 15, 2025', 'Team': 'Red', 'Name': 'Alice', 'Present': True}
 
         response = self.client.get('/attendance/2025-01-15/team/Red/kid/Alice')
 
         self.assertEqual(response.status_code, 200)
+        mock_get_entry.assert_called_once_with('January 15, 2025', 'Red', 'Alice')
 
-    @patch('routes.attendance.get_attendance_entries')
-    @patch('routes.attendance.get_attendance_schedule')
-    def test_kid_attendance_handles_url_encoding(self, mock_get_schedule, mock_get_entries):
+    @patch('routes.attendance.get_attendance_entry')
+    @patch('routes.attendance.get_attendance_day')
+    def test_kid_attendance_handles_url_encoding(self, mock_get_day, mock_get_entry):
         """Should handle URL-encoded kid names"""
-        mock_get_schedule.return_value = [
-            {'Date': 'January 15, 2025', 'Theme': 'Test'}
-        ]
-        mock_get_entries.return_value = [
-            {'Date': 'January 15, 2025', 'Team': 'Red', 'Name': "Alice O'Brien", 'Present': True}
-        ]
+        mock_get_day.return_value = {'Date': 'January 15, 2025', 'Theme': 'Test'}
+        mock_get_entry.return_value = {'Date': 'January 15, 2025', 'Team': 'Red', 'Name': "Alice O'Brien", 'Present': True}
 
         response = self.client.get("/attendance/2025-01-15/team/Red/kid/Alice%20O'Brien")
 
         self.assertEqual(response.status_code, 200)
+        mock_get_entry.assert_called_once_with('January 15, 2025', 'Red', "Alice O'Brien")
 
 
-class TestCheckinFormRoutes(unittest.TestCase):
+class TestCheckinFormRoutes(ClientTestCase):
     """Tests for checkin form route"""
 
-    def setUp(self):
-        app.config['TESTING'] = True
-        self.client = app.test_client()
-
-    @patch('routes.attendance.get_roster')
     @patch('routes.attendance.get_attendance_schedule')
-    def test_checkin_form_shows_team_kids(self, mock_get_schedule, mock_get_roster):
+    @patch('routes.attendance.get_team_roster')
+    @patch('routes.attendance.get_attendance_day')
+    def test_checkin_form_shows_team_kids(self, mock_get_day, mock_get_team_roster, mock_get_schedule):
         """GET /attendance/<date>/team/<team>/checkin should show form with team kids"""
-        mock_get_schedule.return_value = [
-            {'Date': 'January 15, 2025', 'Theme': 'Test'}
-        ]
-        mock_get_roster.return_value = [
-            {'Name': 'Alice', 'Group': 'Red'},
-            {'Name': 'Bob', 'Group': 'Blue'}
+        mock_get_day.return_value = {'Date': 'January 15, 2025', 'Theme': 'Test'}
+        mock_get_schedule.return_value = [mock_get_day.return_value]
+        mock_get_team_roster.return_value = [
+            {'Name': 'Alice', 'Group': 'Red'}
         ]
 
         response = self.client.get('/attendance/2025-01-15/team/Red/checkin')
 
         self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Alice', response.get_data())
+        mock_get_team_roster.assert_called_once_with('Red')
 
-    @patch('routes.attendance.get_attendance_schedule')
-    def test_checkin_form_redirects_if_date_not_found(self, mock_get_schedule):
+    @patch('routes.attendance.get_attendance_day')
+    def test_checkin_form_redirects_if_date_not_found(self, mock_get_day):
         """Should redirect if date not in schedule"""
-        mock_get_schedule.return_value = []
+        mock_get_day.return_value = None
 
         response = self.client.get('/attendance/2025-01-15/team/Red/checkin')
 
         self.assertEqual(response.status_code, 302)
 
 
-class TestSubmitCheckinRoutes(unittest.TestCase):
+class TestSubmitCheckinRoutes(ClientTestCase):
     """Tests for submit checkin POST route"""
 
-    def setUp(self):
-        app.config['TESTING'] = True
-        self.client = app.test_client()
-
-    @patch('routes.attendance.insert_attendance_entry')
+    @patch('routes.attendance.insert_attendance_entries')
     def test_submit_checkin_inserts_record(self, mock_insert):
         """POST /submit_checkin should insert a record"""
         response = self.client.post('/submit_checkin', data={
@@ -213,7 +258,7 @@ class TestSubmitCheckinRoutes(unittest.TestCase):
         self.assertEqual(response.status_code, 302)
         mock_insert.assert_called_once()
 
-    @patch('routes.attendance.insert_attendance_entry')
+    @patch('routes.attendance.insert_attendance_entries')
     def test_submit_checkin_passes_correct_data(self, mock_insert):
         """POST /submit_checkin should pass correct data to insert"""
         self.client.post('/submit_checkin', data={
@@ -224,11 +269,41 @@ class TestSubmitCheckinRoutes(unittest.TestCase):
             'present': 'on',
         })
 
-        call_args = mock_insert.call_args
-        self.assertEqual(call_args[0][0]['Name'], 'Alice')
-        self.assertEqual(call_args[0][0]['Team'], 'Red')
+        entries = mock_insert.call_args[0][0]
+        self.assertEqual(entries[0]['Name'], 'Alice')
+        self.assertEqual(entries[0]['Team'], 'Red')
 
-    @patch('routes.attendance.insert_attendance_entry')
+    @patch('routes.attendance.insert_attendance_entries')
+    def test_submit_checkin_inserts_several_kids_at_once(self, mock_insert):
+        """POST /submit_checkin with several names should insert them in one call"""
+        response = self.client.post('/submit_checkin', data={
+            'name': ['Alice', 'Bob'],
+            'team': 'Red',
+            'date': 'January 15, 2025',
+            'date_str': '2025-01-15',
+            'present': 'on',
+        })
+
+        self.assertEqual(response.status_code, 302)
+        mock_insert.assert_called_once()
+        entries = mock_insert.call_args[0][0]
+        self.assertEqual([entry['Name'] for entry in entries], ['Alice', 'Bob'])
+        self.assertTrue(all(entry['Present'] for entry in entries))
+
+    @patch('routes.attendance.insert_attendance_entries')
+    def test_submit_checkin_without_names_returns_to_form(self, mock_insert):
+        """POST /submit_checkin with no kids selected should insert nothing and go back to the form"""
+        response = self.client.post('/submit_checkin', data={
+            'team': 'Red',
+            'date': 'January 15, 2025',
+            'date_str': '2025-01-15',
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.location.endswith('/attendance/2025-01-15/team/Red/checkin'))
+        mock_insert.assert_not_called()
+
+    @patch('routes.attendance.insert_attendance_entries')
     def test_submit_checkin_redirects_to_team_page(self, mock_insert):
         """POST /submit_checkin should redirect to team attendance page"""
         response = self.client.post('/submit_checkin', data={
@@ -241,7 +316,7 @@ class TestSubmitCheckinRoutes(unittest.TestCase):
         self.assertEqual(response.status_code, 302)
         self.assertIn('/attendance/2025-01-15/team/Red', response.location)
 
-    @patch('routes.attendance.insert_attendance_entry')
+    @patch('routes.attendance.insert_attendance_entries')
     def test_submit_checkin_handles_error(self, mock_insert):
         """POST /submit_checkin should redirect on error"""
         mock_insert.side_effect = Exception('Error')
@@ -256,13 +331,9 @@ class TestSubmitCheckinRoutes(unittest.TestCase):
         self.assertEqual(response.status_code, 302)
 
 
-class TestEditAttendanceRoutes(unittest.TestCase):
+class TestEditAttendanceRoutes(ClientTestCase):
     """Tests for edit attendance POST route"""
 
-    def setUp(self):
-        app.config['TESTING'] = True
-        self.client = app.test_client()
-
     def test_edit_attendance_get_redirects(self):
         """GET /edit_attendance should redirect"""
         response = self.client.get('/edit_attendance')
@@ -270,10 +341,10 @@ class TestEditAttendanceRoutes(unittest.TestCase):
         self.assertEqual(response.status_code, 302)
 
     @patch('routes.attendance.update_attendance_entry')
-    @patch('routes.attendance.get_attendance_schedule')
-    def test_edit_attendance_calls_update_record(self, mock_get_schedule, mock_update):
+    @patch('routes.attendance.get_attendance_day')
+    def test_edit_attendance_calls_update_record(self, mock_get_day, mock_update):
         """POST /edit_attendance should call update"""
-        mock_get_schedule.return_value = [{'Date': 'January 15, 2025', 'Theme': 'Test'}]
+        mock_get_day.return_value = {'Date': 'January 15, 2025', 'Theme': 'Test'}
 
         response = self.client.post('/edit_attendance', data={
             'date_str': '2025-01-15',
@@ -286,10 +357,10 @@ class TestEditAttendanceRoutes(unittest.TestCase):
         mock_update.assert_called_once()
 
     @patch('routes.attendance.update_attendance_entry')
-    @patch('routes.attendance.get_attendance_schedule')
-    def test_edit_attendance_passes_correct_updates(self, mock_get_schedule, mock_update):
+    @patch('routes.attendance.get_attendance_day')
+    def test_edit_attendance_passes_correct_updates(self, mock_get_day, mock_update):
         """POST /edit_attendance should pass correct updates"""
-        mock_get_schedule.return_value = [{'Date': 'January 15, 2025', 'Theme': 'Test'}]
+        mock_get_day.return_value = {'Date': 'January 15, 2025', 'Theme': 'Test'}
 
         self.client.post('/edit_attendance', data={
             'date_str': '2025-01-15',
@@ -1,24 +1,13 @@
-import sys
 import unittest
+from urllib.parse import urlparse
 from unittest.mock import patch, MagicMock
 
-# Mock gspread before importing routes
-sys.modules['gspread'] = MagicMock()
-sys.modules['gspread.exceptions'] = MagicMock()
-sys.modules['oauth2client'] = MagicMock()
-sys.modules['oauth2client.service_account'] = MagicMock()
+from tests.helpers import ClientTestCase
 
-with patch.dict('os.environ', {'GOOGLE_SHEETS_CREDS': '{}'}):
-    from tnt import app
 
-
-class TestHomeRoutes(unittest.TestCase):
+class TestHomeRoutes(ClientTestCase):
     """Tests for home route handlers"""
 
-    def setUp(self):
-        app.config['TESTING'] = True
-        self.client = app.test_client()
-
     @patch('routes.home.get_schedule')
     def test_home_returns_schedule_data(self, mock_get_schedule):
         """GET / should return schedule data"""
@@ -39,23 +28,18 @@ class TestHomeRoutes(unittest.TestCase):
         response = self.client.get('/')
 
         self.assertEqual(response.status_code, 200)
-        self.assertIn(b'Sheet not found', response.data)
+        body = response.get_data()
+        self.assertIn(b'Sheet not found', body)
 
 
-class TestHomeDetailsRoutes(unittest.TestCase):
+class TestHomeDetailsRoutes(ClientTestCase):
     """Tests for home details route"""
 
-    def setUp(self):
-        app.config['TESTING'] = True
-        self.client = app.test_client()
-
-    @patch('routes.home.get_weekly_totals')
-    @patch('routes.home.get_schedule')
-    def test_home_details_shows_day_data(self, mock_get_schedule, mock_get_totals):
+    @patch('routes.home.get_weekly_totals_for_date')
+    @patch('routes.home.get_schedule_day')
+    def test_home_details_shows_day_data(self, mock_get_day, mock_get_totals):
         """GET /home/<date_str> should show day details"""
-        mock_get_schedule.return_value = [
-            {'Date': 'January 15, 2025', 'Theme': 'Test Theme'}
-        ]
+        mock_get_day.return_value = {'Date': 'January 15, 2025', 'Theme': 'Test Theme'}
         mock_get_totals.return_value = [
             {'Date': 'January 15, 2025', 'Team': 'Red', 'Total': 10}
         ]
@@ -63,46 +47,52 @@ class TestHomeDetailsRoutes(unittest.TestCase):
         response = self.client.get('/home/2025-01-15')
 
         self.assertEqual(response.status_code, 200)
+        mock_get_totals.assert_called_once_with('January 15, 2025')
 
-    @patch('routes.home.get_schedule')
-    def test_home_details_redirects_if_date_not_found(self, mock_get_schedule):
+    @patch('routes.home.get_weekly_totals_for_date')
+    @patch('routes.home.get_schedule_day')
+    def test_home_details_redirects_if_date_not_found(self, mock_get_day, mock_get_totals):
         """GET /home/<date_str> should redirect if date not in schedule"""
-        mock_get_schedule.return_value = [
-            {'Date': 'January 15, 2025', 'Theme': 'Test Theme'}
-        ]
+        mock_get_day.return_value = None
 
         response = self.client.get('/home/2025-12-31')
 
         self.assertEqual(response.status_code, 302)
+        self.assertEqual(urlparse(response.location).path, '/')
+        mock_get_totals.assert_not_called()
 
-    @patch('routes.home.get_schedule')
-    def test_home_details_handles_error(self, mock_get_schedule):
+    @patch('routes.home.get_weekly_totals_for_date')
+    @patch('routes.home.get_schedule_day')
+    def test_home_details_redirects_if_totals_fail(self, mock_get_day, mock_get_totals):
+        """GET /home/<date_str> should redirect when reading the totals fails"""
+        mock_get_day.return_value = {'Date': 'January 15, 2025', 'Theme': 'Test Theme'}
+        mock_get_totals.side_effect = Exception('Error')
+
+        response = self.client.get('/home/2025-01-15')
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(urlparse(response.location).path, '/')
+
+    @patch('routes.home.get_schedule_day')
+    def test_home_details_handles_error(self, mock_get_day):
         """GET /home/<date_str> should redirect on error"""
-        mock_get_schedule.side_effect = Exception('Error')
+        mock_get_day.side_effect = Exception('Error')
 
         response = self.client.get('/home/2025-01-15')
 
         self.assertEqual(response.status_code, 302)
 
 
-class TestHomeTeamDetailsRoutes(unittest.TestCase):
+class TestHomeTeamDetailsRoutes(ClientTestCase):
     """Tests for team details route"""
 
-    def setUp(self):
-        app.config['TESTING'] = True
-        self.client = app.test_client()
-
-    @patch('routes.home.get_completed_sections')
-    @patch('routes.home.get_weekly_totals')
-    @patch('routes.home.get_schedule')
-    def test_team_details_shows_team_data(self, mock_get_schedule, mock_get_totals, mock_get_sections):
+    @patch('routes.home.get_completed_sections_for_team')
+    @patch('routes.home.get_weekly_totals_for_team')
+    @patch('routes.home.get_schedule_day')
+    def test_team_details_shows_team_data(self, mock_get_day, mock_get_totals, mock_get_sections):
         """GET /home/<date>/team/<team> should show team details"""
-        mock_get_schedule.return_value = [
-            {'Date': 'January 15, 2025', 'Theme': 'Test Theme'}
-        ]
-        mock_get_totals.return_value = [
-            {'Date': 'January 15, 2025', 'Team': 'Red', 'Total': 10}
-        ]
+        mock_get_day.return_value = {'Date': 'January 15, 2025', 'Theme': 'Test Theme'}
+        mock_get_totals.return_value = {'Date': 'January 15, 2025', 'Team': 'Red', 'Total': 10}
         mock_get_sections.return_value = [
             {'Date': 'January 15, 2025', 'Team': 'Red', 'Name': 'Alice', 'Section': '1.1'}
         ]
@@ -111,17 +101,13 @@ class TestHomeTeamDetailsRoutes(unittest.TestCase):
 
         self.assertEqual(response.status_code, 200)
 
-    @patch('routes.home.get_completed_sections')
-    @patch('routes.home.get_weekly_totals')
-    @patch('routes.home.get_schedule')
-    def test_team_details_groups_sections_by_kid(self, mock_get_schedule, mock_get_totals, mock_get_sections):
+    @patch('routes.home.get_completed_sections_for_team')
+    @patch('routes.home.get_weekly_totals_for_team')
+    @patch('routes.home.get_schedule_day')
+    def test_team_details_groups_sections_by_kid(self, mock_get_day, mock_get_totals, mock_get_sections):
         """Should group sections by kid name"""
-        mock_get_schedule.return_value = [
-            {'Date': 'January 15, 2025', 'Theme': 'Test'}
-        ]
-        mock_get_totals.return_value = [
-            {'Date': 'January 15, 2025', 'Team': 'Red', 'Total': 10}
-        ]
+        mock_get_day.return_value = {'Date': 'January 15, 2025', 'Theme': 'Test'}
+        mock_get_totals.return_value = {'Date': 'January 15, 2025', 'Team': 'Red', 'Total': 10}
         mock_get_sections.return_value = [
             {'Date': 'January 15, 2025', 'Team': 'Red', 'Name': 'Alice', 'Section': '1.1'},
             {'Date': 'January 15, 2025', 'Team': 'Red', 'Name': 'Alice', 'Section': '1.2'},
@@ -132,56 +118,77 @@ class TestHomeTeamDetailsRoutes(unittest.TestCase):
 
         self.assertEqual(response.status_code, 200)
 
-    @patch('routes.home.get_schedule')
-    def test_team_details_redirects_if_date_not_found(self, mock_get_schedule):
+    @patch('routes.home.get_schedule_day')
+    def test_team_details_redirects_if_date_not_found(self, mock_get_day):
         """Should redirect if date not in schedule"""
-        mock_get_schedule.return_value = []
+        mock_get_day.return_value = None
 
         response = self.client.get('/home/2025-01-15/team/Red')
 
         self.assertEqual(response.status_code, 302)
 
 
-class TestRecordSectionFormRoutes(unittest.TestCase):
-    """Tests for record section form route"""
+    def test_home_team_details_hides_zero_stats(self):
+        """A '0' totals cell should be hidden like an empty one, while non-zero stats show"""
+        from models import sheets
+
+        def values_batch_get(ranges, params):
+            if ranges == ["'Completed Sections RAW'"]:
+                return {'valueRanges': [{'values': [['Date', 'Team', 'Name', 'Section']]}]}
+            return {'valueRanges': [
+                {'values': [['Date', 'Theme'], ['January 15, 2025', 'Space']]},
+                {'values': [['Date', 'Team', 'Team Total Points', 'Gold Credits', 'Silver Credits'],
+                            ['January 15, 2025', 'Red', '12', '0', '3']]},
+            ]}
+
+        spreadsheet = MagicMock()
+        spreadsheet.values_batch_get.side_effect = values_batch_get
+        sheets._cache.clear()
+        self.addCleanup(sheets._cache.clear)
+        self.addCleanup(sheets.invalidate_headers)
+
+        with patch('models.sheets._get_spreadsheet_instance', return_value=spreadsheet):
+            response = self.client.get('/home/2025-01-15/team/Red')
+
+        body = response.get_data(as_text=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Silver Credits', body)
+        self.assertNotIn('Gold Credits', body)
 
-    def setUp(self):
-        app.config['TESTING'] = True
-        self.client = app.test_client()
 
-    @patch('routes.home.get_roster')
+class TestRecordSectionFormRoutes(ClientTestCase):
+    """Tests for record section form route"""
+
     @patch('routes.home.get_schedule')
-    def test_record_section_form_shows_team_kids(self, mock_get_schedule, mock_get_roster):
+    @patch('routes.home.get_team_roster')
+    @patch('routes.home.get_schedule_day')
+    def test_record_section_form_shows_team_kids(self, mock_get_day, mock_get_team_roster, mock_get_schedule):
         """GET /home/<date>/team/<team>/record_section should show form with team kids"""
-        mock_get_schedule.return_value = [
-            {'Date': 'January 15, 2025', 'Theme': 'Test'}
-        ]
-        mock_get_roster.return_value = [
-            {'Name': 'Alice', 'Group': 'Red'},
-            {'Name': 'Bob', 'Group': 'Blue'}
+        mock_get_day.return_value = {'Date': 'January 15, 2025', 'Theme': 'Test'}
+        mock_get_schedule.return_value = [mock_get_day.return_value]
+        mock_get_team_roster.return_value = [
+            {'Name': 'Alice', 'Group': 'Red'}
         ]
 
         response = self.client.get('/home/2025-01-15/team/Red/record_section')
 
         self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Alice', response.get_data())
+        mock_get_team_roster.assert_called_once_with('Red')
 
-    @patch('routes.home.get_schedule')
-    def test_record_section_form_redirects_if_date_not_found(self, mock_get_schedule):
+    @patch('routes.home.get_schedule_day')
+    def test_record_section_form_redirects_if_date_not_found(self, mock_get_day):
         """Should redirect if date not in schedule"""
-        mock_get_schedule.return_value = []
+        mock_get_day.return_value = None
 
         response = self.client.get('/home/2025-01-15/team/Red/record_section')
 
         self.assertEqual(response.status_code, 302)
 
 
-class TestSubmitSectionRoutes(unittest.TestCase):
+class TestSubmitSectionRoutes(ClientTestCase):
     """Tests for submit section POST route"""
 
-    def setUp(self):
-        app.config['TESTING'] = True
-        self.client = app.test_client()
-
     @patch('routes.home.insert_completed_section')
     def test_submit_section_inserts_record(self, mock_insert):
         """POST /submit_section should insert a record"""
@@ -242,13 +249,9 @@ class TestSubmitSectionRoutes(unittest.TestCase):
         self.assertEqual(response.status_code, 302)
 
 
-class TestEditSectionRoutes(unittest.TestCase):
+class TestEditSectionRoutes(ClientTestCase):
     """Tests for edit section POST route"""
 
-    def setUp(self):
-        app.config['TESTING'] = True
-        self.client = app.test_client()
-
     def test_edit_section_get_redirects(self):
         """GET /edit_section should redirect"""
         response = self.client.get('/edit_section')
@@ -256,10 +259,10 @@ class TestEditSectionRoutes(unittest.TestCase):
         self.assertEqual(response.status_code, 302)
 
     @patch('routes.home.update_completed_section')
-    @patch('routes.home.get_schedule')
-    def test_edit_section_calls_update_record(self, mock_get_schedule, mock_update):
+    @patch('routes.home.get_schedule_day')
+    def test_edit_section_calls_update_record(self, mock_get_day, mock_update):
         """POST /edit_section should call update"""
-        mock_get_schedule.return_value = [{'Date': 'January 15, 2025', 'Theme': 'Test'}]
+        mock_get_day.return_value = {'Date': 'January 15, 2025', 'Theme': 'Test'}
 
         response = self.client.post('/edit_section', data={
             'date_str': '2025-01-15',
@@ -273,10 +276,10 @@ class TestEditSectionRoutes(unittest.TestCase):
         mock_update.assert_called_once()
 
     @patch('routes.home.update_completed_section')
-    @patch('routes.home.get_schedule')
-    def test_edit_section_passes_correct_updates(self, mock_get_schedule, mock_update):
+    @patch('routes.home.get_schedule_day')
+    def test_edit_section_passes_correct_updates(self, mock_get_day, mock_update):
         """POST /edit_section should pass correct updates"""
-        mock_get_schedule.return_value = [{'Date': 'January 15, 2025', 'Theme': 'Test'}]
+        mock_get_day.return_value = {'Date': 'January 15, 2025', 'Theme': 'Test'}
 
         self.client.post('/edit_section', data={
             'date_str': '2025-01-15',
@@ -294,20 +297,14 @@ class TestEditSectionRoutes(unittest.TestCase):
         self.assertEqual(updates['Gold Credit'], 'FALSE')
 
 
-class TestHomeSectionDetailsRoutes(unittest.TestCase):
+class TestHomeSectionDetailsRoutes(ClientTestCase):
     """Tests for section details route"""
 
-    def setUp(self):
-        app.config['TESTING'] = True
-        self.client = app.test_client()
-
-    @patch('routes.home.get_completed_sections')
-    @patch('routes.home.get_schedule')
-    def test_section_details_shows_entry(self, mock_get_schedule, mock_get_sections):
+    @patch('routes.home.get_completed_sections_for_team')
+    @patch('routes.home.get_schedule_day')
+    def test_section_details_shows_entry(self, mock_get_day, mock_get_sections):
         """GET section details should show section entry"""
-        mock_get_schedule.return_value = [
-            {'Date': 'January 15, 2025', 'Theme': 'Test'}
-        ]
+        mock_get_day.return_value = {'Date': 'January 15, 2025', 'Theme': 'Test'}
         mock_get_sections.return_value = [
             {'Date': 'January 15, 2025', 'Team': 'Red', 'Name': 'Alice', 'Section': '1.1'}
         ]
@@ -316,13 +313,28 @@ class TestHomeSectionDetailsRoutes(unittest.TestCase):
 
         self.assertEqual(response.status_code, 200)
 
-    @patch('routes.home.get_completed_sections')
-    @patch('routes.home.get_schedule')
-    def test_section_details_handles_url_encoding(self, mock_get_schedule, mock_get_sections):
-        """Should handle URL-encoded kid names"""
-        mock_get_schedule.return_value = [
-            {'Date': 'January 15, 2025', 'Theme': 'Test'}
+    @patch('routes.home.get_completed_sections_for_team')
+    @patch('routes.home.get_schedule_day')
+    def test_section_details_renders_checkboxes(self, mock_get_day, mock_get_sections):
+        """Truthy cells should render checked, and identifying fields should not get a toggle"""
+        mock_get_day.return_value = {'Date': 'January 15, 2025', 'Theme': 'Test'}
+        mock_get_sections.return_value = [
+            {'Date': 'January 15, 2025', 'Team': 'Red', 'Name': 'Alice', 'Section': '1.1',
+             'Silver Credit': True, 'Gold Credit': 'FALSE'}
         ]
+
+        response = self.client.get('/home/2025-01-15/team/Red/kid/Alice/section/1.1')
+
+        body = response.get_data(as_text=True)
+        self.assertIn('name="Silver Credit" checked', body)
+        self.assertNotIn('name="Gold Credit" checked', body)
+        self.assertNotIn('name="Team"', body)
+
+    @patch('routes.home.get_completed_sections_for_team')
+    @patch('routes.home.get_schedule_day')
+    def test_section_details_handles_url_encoding(self, mock_get_day, mock_get_sections):
+        """Should handle URL-encoded kid names"""
+        mock_get_day.return_value = {'Date': 'January 15, 2025', 'Theme': 'Test'}
         mock_get_sections.return_value = [
             {'Date': 'January 15, 2025', 'Team': 'Red', 'Name': "Alice O'Brien", 'Section': '1.1'}
         ]
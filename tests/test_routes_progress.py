@@ -1,24 +1,12 @@
-import sys
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, DEFAULT
 
-# Mock gspread before importing routes
-sys.modules['gspread'] = MagicMock()
-sys.modules['gspread.exceptions'] = MagicMock()
-sys.modules['oauth2client'] = MagicMock()
-sys.modules['oauth2client.service_account'] = MagicMock()
+from tests.helpers import ClientTestCase
 
-with patch.dict('os.environ', {'GOOGLE_SHEETS_CREDS': '{}'}):
-    from tnt import app
 
-
-class TestProgressRoutes(unittest.TestCase):
+class TestProgressRoutes(ClientTestCase):
     """Tests for progress route handlers"""
 
-    def setUp(self):
-        app.config['TESTING'] = True
-        self.client = app.test_client()
-
     @patch('routes.progress.get_roster')
     def test_progress_returns_students(self, mock_get_roster):
         """GET /progress should return all students from roster"""
@@ -40,23 +28,19 @@ class TestProgressRoutes(unittest.TestCase):
         response = self.client.get('/progress')
 
         self.assertEqual(response.status_code, 200)
-        self.assertIn(b'Sheet not found', response.data)
+        body = response.get_data()
+        self.assertIn(b'Sheet not found', body)
 
 
-class TestStudentProgressRoutes(unittest.TestCase):
+class TestStudentProgressRoutes(ClientTestCase):
     """Tests for student progress route"""
 
-    def setUp(self):
-        app.config['TESTING'] = True
-        self.client = app.test_client()
-
-    @patch('routes.progress.get_completed_sections')
-    @patch('routes.progress.get_roster')
-    def test_student_progress_shows_student_data(self, mock_get_roster, mock_get_sections):
+    @patch('routes.progress.get_student_credit_counts', return_value={'total': 1, 'silver': 1, 'gold': 0})
+    @patch('routes.progress.get_completed_sections_for_student')
+    @patch('routes.progress.get_student')
+    def test_student_progress_shows_student_data(self, mock_get_student, mock_get_sections, mock_get_counts):
         """GET /progress/student/<name> should show student progress"""
-        mock_get_roster.return_value = [
-            {'Name': 'Alice', 'Group': 'Red'}
-        ]
+        mock_get_student.return_value = {'Name': 'Alice', 'Group': 'Red'}
         mock_get_sections.return_value = [
             {'Name': 'Alice', 'Section': '1.1', 'Silver Credit': 'TRUE', 'Gold Credit': 'FALSE'},
             {'Name': 'Alice', 'Section': '1.2', 'Silver Credit': 'TRUE', 'Gold Credit': 'TRUE'},
@@ -66,30 +50,33 @@ class TestStudentProgressRoutes(unittest.TestCase):
 
         self.assertEqual(response.status_code, 200)
 
-    @patch('routes.progress.get_completed_sections')
-    @patch('routes.progress.get_roster')
-    def test_student_progress_calculates_stats(self, mock_get_roster, mock_get_sections):
+    @patch('routes.progress.get_student_credit_counts', return_value={'total': 1, 'silver': 1, 'gold': 0})
+    @patch('routes.progress.get_completed_sections_for_student')
+    @patch('routes.progress.get_student')
+    def test_student_progress_calculates_stats(self, mock_get_student, mock_get_sections, mock_get_counts):
         """Should calculate silver and gold credit counts"""
-        mock_get_roster.return_value = [
-            {'Name': 'Alice', 'Group': 'Red'}
-        ]
+        mock_get_student.return_value = {'Name': 'Alice', 'Group': 'Red'}
         mock_get_sections.return_value = [
             {'Name': 'Alice', 'Section': '1.1', 'Silver Credit': 'TRUE', 'Gold Credit': 'FALSE'},
             {'Name': 'Alice', 'Section': '1.2', 'Silver Credit': 'TRUE', 'Gold Credit': 'TRUE'},
             {'Name': 'Alice', 'Section': '1.3', 'Silver Credit': 'FALSE', 'Gold Credit': 'FALSE'},
         ]
+        mock_get_counts.return_value = {'total': 3, 'silver': 2, 'gold': 1}
 
         response = self.client.get('/progress/student/Alice')
 
         self.assertEqual(response.status_code, 200)
-
-    @patch('routes.progress.get_completed_sections')
-    @patch('routes.progress.get_roster')
-    def test_student_progress_handles_url_encoding(self, mock_get_roster, mock_get_sections):
+        body = response.get_data(as_text=True)
+        for count in ('3', '2', '1'):
+            self.assertIn(f'<span class="stat-value">{count}</span>', body)
+        mock_get_counts.assert_called_once_with('Alice')
+
+    @patch('routes.progress.get_student_credit_counts', return_value={'total': 1, 'silver': 1, 'gold': 0})
+    @patch('routes.progress.get_completed_sections_for_student')
+    @patch('routes.progress.get_student')
+    def test_student_progress_handles_url_encoding(self, mock_get_student, mock_get_sections, mock_get_counts):
         """Should handle URL-encoded student names"""
-        mock_get_roster.return_value = [
-            {'Name': "Alice O'Brien", 'Group': 'Red'}
-        ]
+        mock_get_student.return_value = {'Name': "Alice O'Brien", 'Group': 'Red'}
         mock_get_sections.return_value = [
             {'Name': "Alice O'Brien", 'Section': '1.1', 'Silver Credit': 'TRUE', 'Gold Credit': 'FALSE'}
         ]
@@ -98,40 +85,39 @@ class TestStudentProgressRoutes(unittest.TestCase):
 
         self.assertEqual(response.status_code, 200)
 
-    @patch('routes.progress.get_completed_sections')
-    @patch('routes.progress.get_roster')
-    def test_student_progress_filters_by_student(self, mock_get_roster, mock_get_sections):
+    @patch('models.sheets.get_sheet_data')
+    @patch('routes.progress.get_student')
+    def test_student_progress_filters_by_student(self, mock_get_student, mock_get_sheet_data):
         """Should only include sections for the requested student"""
-        mock_get_roster.return_value = [
-            {'Name': 'Alice', 'Group': 'Red'}
-        ]
-        mock_get_sections.return_value = [
+        mock_get_student.return_value = {'Name': 'Alice', 'Group': 'Red'}
+        # Both students' rows come back from the sheet; the name index must pick Alice's
+        mock_get_sheet_data.return_value = [
             {'Name': 'Alice', 'Section': '1.1', 'Silver Credit': 'TRUE', 'Gold Credit': 'FALSE'},
-            {'Name': 'Bob', 'Section': '1.1', 'Silver Credit': 'TRUE', 'Gold Credit': 'TRUE'},
+            {'Name': 'Bob', 'Section': '2.4', 'Silver Credit': 'TRUE', 'Gold Credit': 'TRUE'},
         ]
 
         response = self.client.get('/progress/student/Alice')
 
         self.assertEqual(response.status_code, 200)
+        body = response.get_data(as_text=True)
+        self.assertIn('Section 1.1', body)
+        self.assertNotIn('Section 2.4', body)
+        self.assertIn('<span class="stat-value">0</span>', body)  # Bob's gold credit isn't counted
 
-    @patch('routes.progress.get_roster')
-    def test_student_progress_handles_error(self, mock_get_roster):
+    @patch('routes.progress.get_student')
+    def test_student_progress_handles_error(self, mock_get_student):
         """Should redirect on error"""
-        mock_get_roster.side_effect = Exception('Error')
+        mock_get_student.side_effect = Exception('Error')
 
         response = self.client.get('/progress/student/Alice')
 
         self.assertEqual(response.status_code, 302)
 
 
-class TestStudentSectionDetailsRoutes(unittest.TestCase):
+class TestStudentSectionDetailsRoutes(ClientTestCase):
     """Tests for student section details route"""
 
-    def setUp(self):
-        app.config['TESTING'] = True
-        self.client = app.test_client()
-
-    @patch('routes.progress.get_completed_sections')
+    @patch('routes.progress.get_completed_sections_for_student')
     def test_section_details_shows_entry(self, mock_get_sections):
         """GET /progress/student/<name>/section/<index> should show section"""
         mock_get_sections.return_value = [
@@ -143,7 +129,7 @@ class TestStudentSectionDetailsRoutes(unittest.TestCase):
 
         self.assertEqual(response.status_code, 200)
 
-    @patch('routes.progress.get_completed_sections')
+    @patch('routes.progress.get_completed_sections_for_student')
     def test_section_details_redirects_invalid_index(self, mock_get_sections):
         """Should redirect if section index is out of range"""
         mock_get_sections.return_value = [
@@ -154,7 +140,7 @@ class TestStudentSectionDetailsRoutes(unittest.TestCase):
 
         self.assertEqual(response.status_code, 302)
 
-    @patch('routes.progress.get_completed_sections')
+    @patch('routes.progress.get_completed_sections_for_student')
     def test_section_details_handles_error(self, mock_get_sections):
         """Should redirect on error"""
         mock_get_sections.side_effect = Exception('Error')
@@ -164,24 +150,19 @@ class TestStudentSectionDetailsRoutes(unittest.TestCase):
         self.assertEqual(response.status_code, 302)
 
 
-class TestEditProgressSectionRoutes(unittest.TestCase):
+@patch.multiple('routes.progress', get_completed_sections_for_student=DEFAULT, update_completed_section=DEFAULT)
+class TestEditProgressSectionRoutes(ClientTestCase):
     """Tests for edit progress section POST route"""
 
-    def setUp(self):
-        app.config['TESTING'] = True
-        self.client = app.test_client()
-
-    def test_edit_progress_section_get_redirects(self):
+    def test_edit_progress_section_get_redirects(self, *, get_completed_sections_for_student, update_completed_section):
         """GET /edit_progress_section should redirect"""
         response = self.client.get('/edit_progress_section')
 
         self.assertEqual(response.status_code, 302)
 
-    @patch('routes.progress.update_completed_section')
-    @patch('routes.progress.get_completed_sections')
-    def test_edit_progress_section_calls_update_record(self, mock_get_sections, mock_update):
+    def test_edit_progress_section_calls_update_record(self, *, get_completed_sections_for_student, update_completed_section):
         """POST /edit_progress_section should call update"""
-        mock_get_sections.return_value = [
+        get_completed_sections_for_student.return_value = [
             {'Name': 'Alice', 'Date': 'January 15, 2025', 'Section': '1.1', 'Silver Credit': False}
         ]
 
@@ -192,13 +173,11 @@ class TestEditProgressSectionRoutes(unittest.TestCase):
         })
 
         self.assertEqual(response.status_code, 302)
-        mock_update.assert_called_once()
+        update_completed_section.assert_called_once()
 
-    @patch('routes.progress.update_completed_section')
-    @patch('routes.progress.get_completed_sections')
-    def test_edit_progress_section_passes_correct_updates(self, mock_get_sections, mock_update):
+    def test_edit_progress_section_passes_correct_updates(self, *, get_completed_sections_for_student, update_completed_section):
         """POST /edit_progress_section should pass correct updates"""
-        mock_get_sections.return_value = [
+        get_completed_sections_for_student.return_value = [
             {'Name': 'Alice', 'Date': 'January 15, 2025', 'Section': '1.1'}
         ]
 
@@ -208,16 +187,14 @@ class TestEditProgressSectionRoutes(unittest.TestCase):
             'Silver Credit': 'on',
         })
 
-        call_args = mock_update.call_args
+        call_args = update_completed_section.call_args
         updates = call_args[0][1]
         self.assertEqual(updates['Silver Credit'], 'TRUE')
         self.assertEqual(updates['Gold Credit'], 'FALSE')
 
-    @patch('routes.progress.update_completed_section')
-    @patch('routes.progress.get_completed_sections')
-    def test_edit_progress_section_redirects_to_section(self, mock_get_sections, mock_update):
+    def test_edit_progress_section_redirects_to_section(self, *, get_completed_sections_for_student, update_completed_section):
         """POST /edit_progress_section should redirect to section details"""
-        mock_get_sections.return_value = [
+        get_completed_sections_for_student.return_value = [
             {'Name': 'Alice', 'Date': 'January 15, 2025', 'Section': '1.1'}
         ]
 
@@ -229,10 +206,9 @@ class TestEditProgressSectionRoutes(unittest.TestCase):
         self.assertEqual(response.status_code, 302)
         self.assertIn('/progress/student/Alice/section/0', response.location)
 
-    @patch('routes.progress.get_completed_sections')
-    def test_edit_progress_section_handles_invalid_index(self, mock_get_sections):
+    def test_edit_progress_section_handles_invalid_index(self, *, get_completed_sections_for_student, update_completed_section):
         """POST /edit_progress_section should redirect on invalid index"""
-        mock_get_sections.return_value = [
+        get_completed_sections_for_student.return_value = [
             {'Name': 'Alice', 'Date': 'January 15, 2025', 'Section': '1.1'}
         ]
 
@@ -243,10 +219,9 @@ class TestEditProgressSectionRoutes(unittest.TestCase):
 
         self.assertEqual(response.status_code, 302)
 
-    @patch('routes.progress.get_completed_sections')
-    def test_edit_progress_section_handles_error(self, mock_get_sections):
+    def test_edit_progress_section_handles_error(self, *, get_completed_sections_for_student, update_completed_section):
         """POST /edit_progress_section should redirect on error"""
-        mock_get_sections.side_effect = Exception('Error')
+        get_completed_sections_for_student.side_effect = Exception('Error')
 
         response = self.client.post('/edit_progress_section', data={
             'student_name': 'Alice',
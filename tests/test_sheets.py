@@ -1,100 +1,464 @@
-import sys
+import threading
 import time
-import unittest
 from unittest.mock import patch, MagicMock
 
-# Mock gspread and oauth2client before importing sheets module
-sys.modules['gspread'] = MagicMock()
-sys.modules['gspread.exceptions'] = MagicMock()
-sys.modules['oauth2client'] = MagicMock()
-sys.modules['oauth2client.service_account'] = MagicMock()
+import pytest
 
 with patch.dict('os.environ', {'GOOGLE_SHEETS_CREDS': '{}'}):
     from models import sheets
     from models.cache import CacheEntry
 
 
-class TestCacheEntry(unittest.TestCase):
-    """Tests for CacheEntry dataclass"""
-
-    def test_age_calculation(self):
-        """Should calculate age correctly"""
-        entry = CacheEntry(data=[], timestamp=time.time() - 100, size_bytes=0)
-        self.assertAlmostEqual(entry.age(), 100, delta=1)
-
-    def test_is_stale(self):
-        """Should return True when age exceeds TTL"""
-        entry = CacheEntry(data=[], timestamp=time.time() - 100, size_bytes=0)
-        self.assertTrue(entry.is_stale(ttl=50))
-        self.assertFalse(entry.is_stale(ttl=200))
-
-    def test_is_fresh(self):
-        """Should return True when age is within TTL"""
-        entry = CacheEntry(data=[], timestamp=time.time() - 10, size_bytes=0)
-        self.assertTrue(entry.is_fresh(ttl=50))
-        self.assertFalse(entry.is_fresh(ttl=5))
-
-    def test_mark_fresh(self):
-        """Should update timestamp to current time"""
-        entry = CacheEntry(data=[], timestamp=time.time() - 100, size_bytes=0)
-        old_timestamp = entry.timestamp
-        entry.mark_fresh()
-        self.assertGreater(entry.timestamp, old_timestamp)
-
-    def test_add_row(self):
-        """Should append row and update size"""
-        entry = CacheEntry(data=[{'Name': 'Existing'}], timestamp=time.time() - 100, size_bytes=100)
-        old_timestamp = entry.timestamp
-        
-        entry.add_row({'Name': 'New'})
-        
-        self.assertEqual(len(entry.data), 2)
-        self.assertEqual(entry.data[-1], {'Name': 'New'})
-        self.assertGreater(entry.size_bytes, 100)
-        self.assertGreater(entry.timestamp, old_timestamp)
-
-
-class TestGetTtlForSheet(unittest.TestCase):
-    """Tests for _get_ttl_for_sheet()"""
-
-    def test_static_sheets_get_long_ttl(self):
-        """Static sheets should get 1 day TTL"""
-        for sheet in sheets.STATIC_SHEETS:
-            with self.subTest(sheet=sheet):
-                ttl = sheets._get_ttl_for_sheet(sheet)
-                self.assertEqual(ttl, sheets.CACHE_TTL_STATIC)
-
-    def test_dynamic_sheets_get_short_ttl(self):
-        """Dynamic sheets should get short TTL"""
-        dynamic_sheets = [
-            sheets.COMPLETED_SECTIONS_SHEET,
-            sheets.ATTENDANCE_ENTRIES_SHEET,
-            sheets.WEEKLY_TOTALS_SHEET,
+@pytest.fixture(scope='module', autouse=True)
+def clean_cache():
+    """Start and finish this module with an empty sheet cache"""
+    sheets._cache.clear()
+    yield
+    sheets._cache.clear()
+
+
+@pytest.fixture
+def old_entry():
+    """A cache entry created 100 seconds ago"""
+    return CacheEntry(data=[], timestamp=time.monotonic() - 100, size_bytes=0)
+
+
+# =============================================================================
+# CacheEntry
+# =============================================================================
+
+def test_age_calculation(old_entry):
+    """Should calculate age correctly"""
+    assert old_entry.age() == pytest.approx(100, abs=1)
+
+
+def test_is_stale(old_entry):
+    """Should return True when age exceeds TTL"""
+    assert old_entry.is_stale(ttl=50)
+    assert not old_entry.is_stale(ttl=200)
+
+
+def test_is_fresh():
+    """Should return True when age is within TTL"""
+    entry = CacheEntry(data=[], timestamp=time.monotonic() - 10, size_bytes=0)
+    assert entry.is_fresh(ttl=50)
+    assert not entry.is_fresh(ttl=5)
+
+
+def test_mark_fresh(old_entry):
+    """Should update timestamp to current time"""
+    old_timestamp = old_entry.timestamp
+    old_entry.mark_fresh()
+    assert old_entry.timestamp > old_timestamp
+
+
+def test_add_row():
+    """Should append row and update size"""
+    entry = CacheEntry(data=[{'Name': 'Existing'}], timestamp=time.monotonic() - 100, size_bytes=100)
+    old_timestamp = entry.timestamp
+
+    entry.add_row({'Name': 'New'})
+
+    assert len(entry.data) == 2
+    assert entry.data[-1] == {'Name': 'New'}
+    assert entry.size_bytes == 100 + len(b'{"Name":"New"}')
+    assert entry.timestamp > old_timestamp
+
+
+def test_view_built_once():
+    """A view should be built on first use and reused afterwards"""
+    entry = CacheEntry(data=[{'Name': 'Alice'}], timestamp=time.monotonic(), size_bytes=0)
+    build = MagicMock(return_value={'alice': 0})
+
+    first = entry.get_view('by_name', build)
+    second = entry.get_view('by_name', build)
+
+    assert first is second
+    build.assert_called_once_with(entry.data)
+
+
+def test_add_row_clears_views():
+    """Appending a row should rebuild views on next use"""
+    entry = CacheEntry(data=[{'Name': 'Alice'}], timestamp=time.monotonic(), size_bytes=0)
+    count_rows = len
+
+    assert entry.get_view('count', count_rows) == 1
+    entry.add_row({'Name': 'Bob'})
+    assert entry.get_view('count', count_rows) == 2
+
+
+# =============================================================================
+# _get_ttl_for_sheet()
+# =============================================================================
+
+def test_static_sheets_get_long_ttl():
+    """Static sheets should get 1 day TTL"""
+    ttls = {sheets._get_ttl_for_sheet(sheet) for sheet in sheets.STATIC_SHEETS}
+    assert ttls == {sheets.CACHE_TTL_STATIC}
+
+
+def test_dynamic_sheets_get_short_ttl():
+    """Dynamic sheets should get short TTL"""
+    dynamic_sheets = [
+        sheets.COMPLETED_SECTIONS_SHEET,
+        sheets.ATTENDANCE_ENTRIES_SHEET,
+        sheets.WEEKLY_TOTALS_SHEET,
+    ]
+    ttls = {sheets._get_ttl_for_sheet(sheet) for sheet in dynamic_sheets}
+    assert ttls == {sheets.CACHE_TTL_DYNAMIC}
+
+
+def test_unknown_sheets_get_dynamic_ttl():
+    """Unknown sheets should default to dynamic TTL"""
+    assert sheets._get_ttl_for_sheet('Unknown Sheet') == sheets.CACHE_TTL_DYNAMIC
+
+
+# =============================================================================
+# retry_sheets()
+# =============================================================================
+
+class FakeAPIError(Exception):
+    """Stands in for gspread's APIError, which is stubbed out in tests"""
+
+    def __init__(self, status_code):
+        super().__init__(status_code)
+        self.response = MagicMock(status_code=status_code)
+
+
+@pytest.fixture
+def no_sleep():
+    """Make backoff waits instant and record them"""
+    with patch('models.sheets.APIError', FakeAPIError), \
+            patch('models.sheets.time.sleep') as sleep:
+        yield sleep
+
+
+def test_retry_recovers_from_rate_limit(no_sleep):
+    """A call that hits 429 should be retried until it succeeds"""
+    fn = MagicMock(side_effect=[FakeAPIError(429), FakeAPIError(503), 'ok'])
+
+    assert sheets.retry_sheets(fn, 'a', key='b') == 'ok'
+    assert fn.call_count == 3
+    fn.assert_called_with('a', key='b')
+    first_wait, second_wait = [call.args[0] for call in no_sleep.call_args_list]
+    assert first_wait <= sheets.RETRY_INITIAL_WAIT < second_wait
+
+
+def test_retry_gives_up_after_max_tries(no_sleep):
+    """The last error should be raised once every attempt is used up"""
+    fn = MagicMock(side_effect=FakeAPIError(429))
+
+    with pytest.raises(FakeAPIError):
+        sheets.retry_sheets(fn, max_tries=3)
+    assert fn.call_count == 3
+
+
+def test_retry_skips_permanent_errors(no_sleep):
+    """Errors that retrying cannot fix should be raised immediately"""
+    fn = MagicMock(side_effect=FakeAPIError(400))
+
+    with pytest.raises(FakeAPIError):
+        sheets.retry_sheets(fn)
+    fn.assert_called_once()
+    no_sleep.assert_not_called()
+
+
+def test_retry_reauthorizes_once_on_401(no_sleep):
+    """A 401 should reset the client and retry once; a second 401 is raised"""
+    fn = MagicMock(side_effect=[FakeAPIError(401), 'ok'])
+    with patch('models.sheets.reset_spreadsheet') as mock_reset:
+        assert sheets.retry_sheets(fn) == 'ok'
+    mock_reset.assert_called_once()
+
+    fn = MagicMock(side_effect=FakeAPIError(401))
+    with patch('models.sheets.reset_spreadsheet') as mock_reset, pytest.raises(FakeAPIError):
+        sheets.retry_sheets(fn)
+    mock_reset.assert_called_once()
+    assert fn.call_count == 2
+
+
+def test_retry_on_limits_retried_codes(no_sleep):
+    """Codes left out of retry_on should be raised without retrying"""
+    fn = MagicMock(side_effect=FakeAPIError(503))
+
+    with pytest.raises(FakeAPIError):
+        sheets.retry_sheets(fn, retry_on=sheets.APPEND_RETRYABLE_STATUS_CODES)
+    fn.assert_called_once()
+    no_sleep.assert_not_called()
+
+
+# =============================================================================
+# get_sheet_data() cold start
+# =============================================================================
+
+def test_concurrent_cold_reads_share_one_fetch():
+    """Concurrent cold reads of a sheet should trigger a single Google fetch"""
+    spreadsheet = MagicMock()
+    spreadsheet.values_batch_get.side_effect = lambda ranges, params: time.sleep(0.05) or {
+        'valueRanges': [{'values': [['Name'], ['Alice']]}]
+    }
+
+    results = []
+    with patch('models.sheets._get_spreadsheet_instance', return_value=spreadsheet):
+        threads = [
+            threading.Thread(target=lambda: results.append(sheets.get_sheet_data('Cold Sheet')))
+            for _ in range(4)
         ]
-        for sheet in dynamic_sheets:
-            with self.subTest(sheet=sheet):
-                ttl = sheets._get_ttl_for_sheet(sheet)
-                self.assertEqual(ttl, sheets.CACHE_TTL_DYNAMIC)
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    sheets._cache.invalidate('Cold Sheet')
+    spreadsheet.values_batch_get.assert_called_once_with(["'Cold Sheet'"], params=sheets.DISPLAY_GET_PARAMS)
+    assert results == [[{'Name': 'Alice'}]] * 4
+
+
+def test_cold_read_batches_fetch_group():
+    """A cold read should fetch the uncached sheets of its group in one request"""
+    spreadsheet = MagicMock()
+    spreadsheet.values_batch_get.return_value = {'valueRanges': [
+        {'values': [['Date', 'Theme'], ['January 15, 2025', 'Space']]},
+        {'values': [['Date', 'Team'], ['January 15, 2025', 'Red']]},
+    ]}
+
+    with patch('models.sheets._get_spreadsheet_instance', return_value=spreadsheet):
+        data = sheets.get_sheet_data(sheets.ATTENDANCE_SCHEDULE_SHEET)
+
+    cached_totals = sheets._cache.get(sheets.WEEKLY_ATTENDANCE_TOTALS_SHEET)
+    entries_cached = sheets._cache.has(sheets.ATTENDANCE_ENTRIES_SHEET)
+    sheets._cache.clear()
+
+    spreadsheet.values_batch_get.assert_called_once_with([
+        "'Attendance Schedule'", "'Weekly Attendance Totals'",
+    ], params=sheets.DISPLAY_GET_PARAMS)
+    assert data == [{'Date': 'January 15, 2025', 'Theme': 'Space'}]
+    assert cached_totals.data == [{'Date': 'January 15, 2025', 'Team': 'Red'}]
+    assert not entries_cached
+
+
+def test_concurrent_cold_reads_of_a_group_share_one_fetch():
+    """Cold reads of different sheets in one fetch group should share a single fetch"""
+    spreadsheet = MagicMock()
+    spreadsheet.values_batch_get.side_effect = lambda ranges, params: time.sleep(0.05) or {
+        'valueRanges': [{'values': [['Date'], ['January 15, 2025']]} for _ in ranges]
+    }
+
+    with patch('models.sheets._get_spreadsheet_instance', return_value=spreadsheet):
+        threads = [
+            threading.Thread(target=sheets.get_sheet_data, args=(name,))
+            for name in (sheets.SCHEDULE_SHEET, sheets.WEEKLY_TOTALS_SHEET)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    sheets._cache.clear()
+    spreadsheet.values_batch_get.assert_called_once()
+
+
+def test_raw_sheets_read_unformatted():
+    """RAW entry sheets should skip value formatting; other sheets read as displayed"""
+    spreadsheet = MagicMock()
+    spreadsheet.values_batch_get.return_value = {'valueRanges': [{'values': [['Name'], ['Alice']]}]}
+
+    with patch('models.sheets._get_spreadsheet_instance', return_value=spreadsheet):
+        sheets._fetch_sheets([sheets.ATTENDANCE_ENTRIES_SHEET])
+        sheets._fetch_sheets([sheets.WEEKLY_ATTENDANCE_TOTALS_SHEET])
+
+    sheets.invalidate_headers()
+    raw_call, display_call = spreadsheet.values_batch_get.call_args_list
+    assert raw_call.kwargs['params'] == sheets.RAW_GET_PARAMS
+    assert display_call.kwargs['params'] == sheets.DISPLAY_GET_PARAMS
+
+
+def test_values_to_records_keeps_raw_types():
+    """Raw booleans and numbers should pass through, with headers as strings"""
+    records = sheets._values_to_records([['Name', 'Present', 2025], ['Alice', True, 3]])
+    assert records == [{'Name': 'Alice', 'Present': True, '2025': 3}]
+
+
+def test_values_to_records_pads_short_rows():
+    """Rows missing trailing cells should be padded with empty strings"""
+    records = sheets._values_to_records([['Name', 'Team', 'Present'], ['Alice'], []])
+    assert records == [
+        {'Name': 'Alice', 'Team': '', 'Present': ''},
+        {'Name': '', 'Team': '', 'Present': ''},
+    ]
+
+
+def test_values_to_records_numericises_formatted_numbers():
+    """numericise should turn plain number strings into numbers and leave other text alone"""
+    records = sheets._values_to_records(
+        [['Total', 'Rate', 'Goal', 'Blank', 'Date'], ['0', '2.5', '85%', '', 'January 15, 2025']],
+        numericise=True)
+    assert records == [{'Total': 0, 'Rate': 2.5, 'Goal': '85%', 'Blank': '', 'Date': 'January 15, 2025'}]
+
+
+def test_values_to_records_interns_headers():
+    """Records from separate reads should share the same header key strings"""
+    first = sheets._values_to_records([[''.join(['Na', 'me'])], ['Alice']])
+    second = sheets._values_to_records([[''.join(['Na', 'me'])], ['Bob']])
+    assert next(iter(first[0])) is next(iter(second[0]))
+
+
+# =============================================================================
+# _get_spreadsheet_instance()
+# =============================================================================
+
+def test_spreadsheet_session_gets_larger_pool():
+    """The gspread session should be mounted with a pooled HTTPS adapter"""
+    with patch('models.sheets.gspread') as mock_gspread, \
+            patch('models.sheets.get_google_creds'), \
+            patch('models.sheets.HTTPAdapter') as mock_adapter:
+        sheets.get_spreadsheet()
+
+    session = mock_gspread.authorize.return_value.http_client.session
+    session.mount.assert_called_once_with('https://', mock_adapter.return_value)
+    mock_adapter.assert_called_once_with(pool_connections=sheets.HTTP_POOL_CONNECTIONS,
+                                         pool_maxsize=sheets.HTTP_POOL_MAXSIZE)
+
+
+def test_concurrent_first_use_opens_spreadsheet_once():
+    """Threads racing on first use should share one authorize-and-open"""
+    spreadsheet = MagicMock()
+    get_spreadsheet = MagicMock(side_effect=lambda: time.sleep(0.05) or spreadsheet)
+
+    results = []
+    with patch('models.sheets._spreadsheet', None), \
+            patch('models.sheets.get_spreadsheet', get_spreadsheet):
+        threads = [
+            threading.Thread(target=lambda: results.append(sheets._get_spreadsheet_instance()))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    get_spreadsheet.assert_called_once()
+    assert results == [spreadsheet] * 4
+
+
+def test_fetch_reconnects_after_auth_failure(no_sleep):
+    """A 401 should drop the client and retry the fetch once with a fresh one"""
+    stale, fresh = MagicMock(), MagicMock()
+    stale.values_batch_get.side_effect = FakeAPIError(401)
+    fresh.values_batch_get.return_value = {'valueRanges': [{'values': [['Name'], ['Alice']]}]}
+
+    with patch('models.sheets._spreadsheet', stale), \
+            patch('models.sheets.get_google_creds'), \
+            patch('models.sheets.get_spreadsheet', return_value=fresh):
+        records = sheets._fetch_sheets(['Auth Sheet'])
+
+    assert records == {'Auth Sheet': [{'Name': 'Alice'}]}
+    stale.values_batch_get.assert_called_once()
+
+
+# =============================================================================
+# get_worksheet()
+# =============================================================================
+
+def test_worksheet_resolved_once():
+    """Worksheet handles should be looked up once and reused"""
+    spreadsheet = MagicMock()
+
+    with patch('models.sheets._get_spreadsheet_instance', return_value=spreadsheet):
+        first = sheets.get_worksheet('Handle Sheet')
+        second = sheets.get_worksheet('Handle Sheet')
+        sheets.refresh_worksheets()
+        sheets.get_worksheet('Handle Sheet')
+
+    sheets.refresh_worksheets()
+    assert second is first
+    assert spreadsheet.worksheet.call_count == 2
+
+
+def test_refresh_single_worksheet():
+    """refresh_worksheets(name) should only forget that sheet's handle"""
+    spreadsheet = MagicMock()
+
+    with patch('models.sheets._get_spreadsheet_instance', return_value=spreadsheet):
+        sheets.get_worksheet('Handle A')
+        sheets.get_worksheet('Handle B')
+        sheets.refresh_worksheets('Handle A')
+        sheets.get_worksheet('Handle A')
+        sheets.get_worksheet('Handle B')
+
+    sheets.refresh_worksheets()
+    assert [call.args[0] for call in spreadsheet.worksheet.call_args_list] == ['Handle A', 'Handle B', 'Handle A']
+
+
+# =============================================================================
+# get_header_index()
+# =============================================================================
+
+def test_header_index_read_once():
+    """Header row should be fetched once and served from memory afterwards"""
+    worksheet = MagicMock()
+    worksheet.row_values.return_value = ['Name', 'Team', 'Date']
+
+    with patch('models.sheets.get_worksheet', return_value=worksheet):
+        first = sheets.get_header_index('Header Sheet')
+        second = sheets.get_header_index('Header Sheet')
+
+    sheets._header_cache.pop('Header Sheet', None)
+    assert first == {'Name': 1, 'Team': 2, 'Date': 3}
+    assert second is first
+    worksheet.row_values.assert_called_once_with(1)
+
+
+def test_header_index_refresh_refetches():
+    """refresh=True should re-read the header row"""
+    worksheet = MagicMock()
+    worksheet.row_values.side_effect = [['Name'], ['Name', 'Team']]
+
+    with patch('models.sheets.get_worksheet', return_value=worksheet):
+        sheets.get_header_index('Header Sheet')
+        refreshed = sheets.get_header_index('Header Sheet', refresh=True)
+
+    sheets._header_cache.pop('Header Sheet', None)
+    assert refreshed == {'Name': 1, 'Team': 2}
+
+
+def test_invalidate_headers_refetches():
+    """invalidate_headers should make the next lookup re-read that sheet's header row"""
+    worksheet = MagicMock()
+    worksheet.row_values.side_effect = [['Name'], ['Name', 'Team']]
+
+    with patch('models.sheets.get_worksheet', return_value=worksheet):
+        sheets.get_header_index('Header Sheet')
+        sheets.invalidate_headers('Header Sheet')
+        refetched = sheets.get_header_index('Header Sheet')
+
+    sheets.invalidate_headers()
+    assert refetched == {'Name': 1, 'Team': 2}
+
 
-    def test_unknown_sheets_get_dynamic_ttl(self):
-        """Unknown sheets should default to dynamic TTL"""
-        ttl = sheets._get_ttl_for_sheet('Unknown Sheet')
-        self.assertEqual(ttl, sheets.CACHE_TTL_DYNAMIC)
+def test_header_index_taken_from_fetched_header_row():
+    """A fetch should record the sheet's header row for writes"""
+    spreadsheet = MagicMock()
+    spreadsheet.values_batch_get.return_value = {'valueRanges': [
+        {'values': [['Timestamp', 'Name', 'Team'], ['2025-01-15 10:00:00', 'Alice', 'Red']]},
+    ]}
 
+    with patch('models.sheets._get_spreadsheet_instance', return_value=spreadsheet):
+        sheets._fetch_sheets(['Header Sheet'])
+    header_index = sheets.get_header_index('Header Sheet')
 
-class TestInvalidationMap(unittest.TestCase):
-    """Tests for INVALIDATION_MAP configuration"""
+    sheets.invalidate_headers()
+    assert header_index == {'Timestamp': 1, 'Name': 2, 'Team': 3}
 
-    def test_completed_sections_triggers_weekly_totals(self):
-        """Writing to Completed Sections RAW should refresh Weekly Totals"""
-        related = sheets.INVALIDATION_MAP.get(sheets.COMPLETED_SECTIONS_SHEET, [])
-        self.assertIn(sheets.WEEKLY_TOTALS_SHEET, related)
 
-    def test_attendance_entries_triggers_attendance_totals(self):
-        """Writing to Attendance Entries RAW should refresh Attendance Totals"""
-        related = sheets.INVALIDATION_MAP.get(sheets.ATTENDANCE_ENTRIES_SHEET, [])
-        self.assertIn(sheets.WEEKLY_ATTENDANCE_TOTALS_SHEET, related)
+def test_header_index_ignores_cached_rows():
+    """Cached rows (possibly write-through rows in form order) should never define column order"""
+    worksheet = MagicMock()
+    worksheet.row_values.return_value = ['Timestamp', 'Name', 'Team']
+    sheets._cache.set('Header Sheet', [{'Name': 'Alice', 'Team': 'Red', 'Timestamp': '2025-01-15'}], 0)
 
+    with patch('models.sheets.get_worksheet', return_value=worksheet):
+        header_index = sheets.get_header_index('Header Sheet')
 
-if __name__ == '__main__':
-    unittest.main()
+    sheets.invalidate_cache('Header Sheet')
+    assert header_index == {'Timestamp': 1, 'Name': 2, 'Team': 3}
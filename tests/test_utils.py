@@ -1,5 +1,7 @@
 import unittest
-from models.utils import parse_date_string, dates_match, date_to_url, url_to_date
+from unittest.mock import patch
+
+from models.utils import parse_date_string, dates_match, date_key, date_to_url, url_to_date, is_truthy
 
 
 class TestParseDateString(unittest.TestCase):
@@ -12,6 +14,18 @@ class TestParseDateString(unittest.TestCase):
         self.assertEqual(result.month, 9)
         self.assertEqual(result.day, 17)
 
+    def test_iso_format_with_offset(self):
+        """ISO dates without a trailing Z should parse as-is"""
+        result = parse_date_string('2025-09-17T08:30:00+00:00')
+        self.assertEqual((result.year, result.month, result.day), (2025, 9, 17))
+
+    def test_invalid_iso_date(self):
+        """ISO-shaped strings with an impossible date should raise ValueError"""
+        with self.assertRaises(ValueError):
+            parse_date_string('2025-13-45T00:00:00.000Z')
+        with self.assertRaises(ValueError):
+            parse_date_string('20250917T00:00:00Z')
+
     def test_readable_format(self):
         """Should parse 'Month Day, Year' format"""
         result = parse_date_string('September 17, 2025')
@@ -65,6 +79,63 @@ class TestDatesMatch(unittest.TestCase):
         self.assertTrue(dates_match('invalid', 'invalid'))
         self.assertFalse(dates_match('invalid1', 'invalid2'))
 
+    def test_identical_dates_skip_parsing(self):
+        """Identical date values should match without being parsed"""
+        with patch('models.utils._parse_date') as mock_parse:
+            self.assertTrue(dates_match('March 3, 2025', 'March 3, 2025'))
+
+        mock_parse.assert_not_called()
+
+    def test_non_dates_skip_parsing(self):
+        """Values in neither date format should not be handed to the parser"""
+        with patch('models.utils.parse_date_string') as mock_parse:
+            self.assertFalse(dates_match('not a date', 'also not a date'))
+
+        mock_parse.assert_not_called()
+
+    def test_repeated_dates_parsed_once(self):
+        """Each distinct date string should only be parsed once"""
+        from models.utils import _parse_date
+
+        dates_match('March 3, 2025', '2025-03-03T00:00:00.000Z')
+        misses = _parse_date.cache_info().misses
+
+        self.assertTrue(dates_match('March 3, 2025', '2025-03-03T00:00:00.000Z'))
+        self.assertEqual(_parse_date.cache_info().misses, misses)
+
+
+class TestIsTruthy(unittest.TestCase):
+    """Tests for is_truthy()"""
+
+    def test_truthy_values(self):
+        """Checkbox cells and their text forms should read as true"""
+        for value in (True, 'TRUE', 'true', 'Yes', '1', 1):
+            with self.subTest(value=value):
+                self.assertTrue(is_truthy(value))
+
+    def test_falsy_values(self):
+        """Anything else should read as false"""
+        for value in (False, 'FALSE', '', None, 0, 'no'):
+            with self.subTest(value=value):
+                self.assertFalse(is_truthy(value))
+
+
+class TestDateKey(unittest.TestCase):
+    """Tests for date_key()"""
+
+    def test_different_formats_share_key(self):
+        """Formats that dates_match treats as equal should give equal keys"""
+        self.assertEqual(date_key('2025-09-17T00:00:00.000Z'), date_key('September 17, 2025'))
+
+    def test_unparseable_keeps_string(self):
+        """Unparseable dates should key on their string form"""
+        self.assertEqual(date_key('invalid'), 'invalid')
+
+    def test_empty_values(self):
+        """Empty values should have no key"""
+        self.assertIsNone(date_key(''))
+        self.assertIsNone(date_key(None))
+
 
 class TestDateToUrl(unittest.TestCase):
     """Tests for date_to_url()"""
@@ -86,6 +157,15 @@ class TestDateToUrl(unittest.TestCase):
         self.assertEqual(date_to_url('unparseable'), 'unparseable')
 
 
+    def test_repeated_dates_are_memoized(self):
+        """Converting the same date again should be served from the cache"""
+        date_to_url('September 18, 2025')
+        hits = date_to_url.cache_info().hits
+
+        self.assertEqual(date_to_url('September 18, 2025'), '2025-09-18')
+        self.assertEqual(date_to_url.cache_info().hits, hits + 1)
+
+
 class TestUrlToDate(unittest.TestCase):
     """Tests for url_to_date()"""
 
@@ -2,27 +2,55 @@ import unittest
 from unittest.mock import patch, MagicMock
 
 
+class FakeAPIError(Exception):
+    """Stands in for gspread's APIError, which is stubbed out in tests"""
+
+    def __init__(self, status_code):
+        super().__init__(status_code)
+        self.response = MagicMock(status_code=status_code)
+
+
+def wait_for_pending_writes(timeout=1):
+    """Block until every Google write queued so far has finished"""
+    from models.data import _write_executor
+    _write_executor.submit(lambda: None).result(timeout)
+
+
 class TestInsertWriteThrough(unittest.TestCase):
     """Tests for insert write-through caching flow"""
 
     def setUp(self):
+        from models.data import _queue_flush
+
         self.mock_worksheet = MagicMock()
-        self.mock_worksheet.row_values.return_value = ['timestamp', 'Name', 'Team', 'Date', 'Section']
 
         self.mock_cache = MagicMock()
 
         self.patches = [
             patch('models.data._get_worksheet', return_value=self.mock_worksheet),
             patch('models.data._cache', self.mock_cache),
+            patch('models.data._get_header_index', return_value={
+                'timestamp': 1, 'Name': 2, 'Team': 3, 'Date': 4, 'Section': 5,
+            }),
             patch('models.data._trigger_background_refresh'),
             patch('models.data.INVALIDATION_MAP', {'Completed Sections RAW': ['Completed Sections']}),
+            patch('models.data.APIError', FakeAPIError),
+            patch('models.sheets.APIError', FakeAPIError),
+            patch('models.sheets.time.sleep'),
+            # Flush failed rows again straight away instead of after a delay
+            patch('models.data._schedule_flush_retry', side_effect=_queue_flush),
         ]
         for p in self.patches:
             p.start()
 
     def tearDown(self):
+        # Let queued background writes finish while the patches are still active
+        wait_for_pending_writes()
         for p in self.patches:
             p.stop()
+        # Drop rows a failed write put back in the queue
+        from models.data import _pending_appends
+        _pending_appends.clear()
 
     def test_insert_writes_to_storage(self):
         """insert should write to storage first"""
@@ -33,7 +61,8 @@ class TestInsertWriteThrough(unittest.TestCase):
             'Team': 'Red',
         })
 
-        self.mock_worksheet.append_row.assert_called_once()
+        wait_for_pending_writes()
+        self.mock_worksheet.append_rows.assert_called_once()
 
     def test_insert_updates_cache(self):
         """insert should update cache after writing"""
@@ -64,11 +93,10 @@ class TestInsertWriteThrough(unittest.TestCase):
     def test_insert_cache_first(self):
         """insert should update cache first (sync), storage happens async"""
         from models.data import insert_completed_section
-        import time
 
         call_order = []
 
-        self.mock_worksheet.append_row.side_effect = lambda *a, **k: call_order.append('storage')
+        self.mock_worksheet.append_rows.side_effect = lambda *a, **k: call_order.append('storage')
         self.mock_cache.append_row.side_effect = lambda *a, **k: call_order.append('cache')
 
         insert_completed_section({
@@ -79,10 +107,138 @@ class TestInsertWriteThrough(unittest.TestCase):
         # Cache should be first
         self.assertEqual(call_order[0], 'cache')
 
-        # Storage happens async - wait for background thread
-        time.sleep(0.1)
+        # Storage happens async - wait for the background write queue
+        wait_for_pending_writes()
         self.assertIn('storage', call_order)
 
+    def test_insert_writes_row_in_header_order(self):
+        """insert should lay out the appended row by the cached header order"""
+        from models.data import insert_completed_section
+
+        insert_completed_section({
+            'timestamp': '2025-01-15 10:00:00',
+            'Name': 'Test Kid',
+            'Team': 'Red',
+            'Section': '1.1',
+        })
+
+        wait_for_pending_writes()
+        rows = self.mock_worksheet.append_rows.call_args[0][0]
+        self.assertEqual(rows, [['2025-01-15 10:00:00', 'Test Kid', 'Red', '', '1.1']])
+        self.mock_worksheet.row_values.assert_not_called()
+
+    def test_insert_many_appends_once(self):
+        """Inserting several records should write them with a single append_rows"""
+        from models.data import insert_attendance_entries
+
+        insert_attendance_entries([
+            {'Name': 'Alice', 'Team': 'Red'},
+            {'Name': 'Bob', 'Team': 'Red'},
+        ])
+
+        wait_for_pending_writes()
+        rows = self.mock_worksheet.append_rows.call_args[0][0]
+        self.assertEqual([row[1] for row in rows], ['Alice', 'Bob'])
+        self.assertEqual(self.mock_cache.append_row.call_count, 2)
+
+    def test_queued_inserts_share_one_append(self):
+        """Inserts made while the writer is busy should go out in one append_rows"""
+        import threading
+        from models.data import insert_completed_section, _write_executor
+
+        writer_busy = threading.Event()
+        _write_executor.submit(writer_busy.wait, 1)
+        insert_completed_section({'Name': 'Alice', 'Team': 'Red'})
+        insert_completed_section({'Name': 'Bob', 'Team': 'Red'})
+        writer_busy.set()
+
+        wait_for_pending_writes()
+        self.mock_worksheet.append_rows.assert_called_once()
+        rows = self.mock_worksheet.append_rows.call_args[0][0]
+        self.assertEqual([row[1] for row in rows], ['Alice', 'Bob'])
+
+    def test_append_retries_only_rate_limits(self):
+        """Appends should only be retried on 429, since a 5xx may follow a write that went through"""
+        from models.data import insert_completed_section
+        from models.sheets import APPEND_RETRYABLE_STATUS_CODES
+
+        with patch('models.data._retry_sheets') as mock_retry:
+            insert_completed_section({'Name': 'Test Kid', 'Team': 'Red'})
+            wait_for_pending_writes()
+
+        self.assertEqual(mock_retry.call_args.kwargs['retry_on'], APPEND_RETRYABLE_STATUS_CODES)
+        self.assertEqual(APPEND_RETRYABLE_STATUS_CODES, {429})
+
+    def test_append_reconnects_after_auth_failure(self):
+        """A 401 on append should re-authorize and retry against a freshly resolved worksheet"""
+        from models.data import insert_completed_section
+
+        stale, fresh = MagicMock(), MagicMock()
+        stale.append_rows.side_effect = FakeAPIError(401)
+
+        with patch('models.sheets.reset_spreadsheet') as mock_reset, \
+                patch('models.data._get_worksheet', side_effect=[stale, stale, fresh]):
+            insert_completed_section({'Name': 'Test Kid', 'Team': 'Red'})
+            wait_for_pending_writes()
+
+        mock_reset.assert_called_once()
+        fresh.append_rows.assert_called_once()
+
+    def test_failed_write_forgets_worksheet(self):
+        """A failed write should drop the cached worksheet handle for that table"""
+        from models.data import insert_completed_section
+        self.mock_worksheet.append_rows.side_effect = Exception('Sheet not found')
+
+        with patch('models.data._refresh_worksheets') as mock_refresh:
+            insert_completed_section({'Name': 'Test Kid', 'Team': 'Red'})
+            wait_for_pending_writes()
+
+        mock_refresh.assert_called_once_with('Completed Sections RAW')
+
+    def test_server_error_drops_rows(self):
+        """A 5xx may follow an append that went through, so its rows must not be sent again"""
+        from models.data import insert_completed_section
+        self.mock_worksheet.append_rows.side_effect = [FakeAPIError(503), None]
+
+        with patch('models.data.log_write_failure') as mock_log_failure:
+            insert_completed_section({'Name': 'Alice', 'Team': 'Red'})
+            wait_for_pending_writes()
+            insert_completed_section({'Name': 'Bob', 'Team': 'Red'})
+            wait_for_pending_writes()
+
+        mock_log_failure.assert_called_once()
+        self.assertFalse(mock_log_failure.call_args.kwargs.get('requeued', False))
+        sent = [[row[1] for row in call.args[0]] for call in self.mock_worksheet.append_rows.call_args_list]
+        self.assertEqual(sent, [['Alice'], ['Bob']])
+
+    def test_rate_limited_rows_are_flushed_again(self):
+        """Rows rejected with 429 never reached the sheet, so a retry flush should send them once more"""
+        from models.data import insert_completed_section
+        from models.sheets import RETRY_MAX_TRIES
+        self.mock_worksheet.append_rows.side_effect = [FakeAPIError(429)] * RETRY_MAX_TRIES + [None]
+
+        insert_completed_section({'Name': 'Alice', 'Team': 'Red'})
+        wait_for_pending_writes()
+        wait_for_pending_writes()
+
+        self.assertEqual(self.mock_worksheet.append_rows.call_count, RETRY_MAX_TRIES + 1)
+        rows = self.mock_worksheet.append_rows.call_args[0][0]
+        self.assertEqual([row[1] for row in rows], ['Alice'])
+
+    def test_requeued_rows_give_up_after_max_attempts(self):
+        """A row that keeps failing should be dropped after APPEND_MAX_ATTEMPTS flushes"""
+        from models.data import insert_completed_section, APPEND_MAX_ATTEMPTS
+        self.mock_worksheet.append_rows.side_effect = FakeAPIError(429)
+
+        with patch('models.data._retry_sheets', side_effect=lambda fn, **kwargs: fn()), \
+                patch('models.data.log_write_failure') as mock_log_failure:
+            insert_completed_section({'Name': 'Alice', 'Team': 'Red'})
+            for _ in range(APPEND_MAX_ATTEMPTS + 1):
+                wait_for_pending_writes()
+
+        self.assertEqual(self.mock_worksheet.append_rows.call_count, APPEND_MAX_ATTEMPTS)
+        self.assertFalse(mock_log_failure.call_args.kwargs.get('requeued', False))
+
     def test_insert_adds_timestamp(self):
         """insert should add timestamp if not present"""
         from models.data import insert_completed_section
@@ -99,10 +255,6 @@ class TestUpdateWriteThrough(unittest.TestCase):
 
     def setUp(self):
         self.mock_worksheet = MagicMock()
-        self.mock_worksheet.row_values.return_value = ['Name', 'Team', 'Silver Credit']
-        self.mock_worksheet.get_all_records.return_value = [
-            {'Name': 'Test Kid', 'Team': 'Red', 'Silver Credit': 'FALSE'}
-        ]
 
         self.mock_cache = MagicMock()
         mock_cached = MagicMock()
@@ -112,7 +264,13 @@ class TestUpdateWriteThrough(unittest.TestCase):
 
         self.patches = [
             patch('models.data._get_worksheet', return_value=self.mock_worksheet),
+            patch('models.data._fetch_sheets', return_value={'Completed Sections RAW': [
+                {'Name': 'Test Kid', 'Team': 'Red', 'Silver Credit': 'FALSE'}
+            ]}),
             patch('models.data._cache', self.mock_cache),
+            patch('models.data._get_header_index', return_value={
+                'Name': 1, 'Team': 2, 'Silver Credit': 3,
+            }),
             patch('models.data._trigger_background_refresh'),
             patch('models.data.INVALIDATION_MAP', {'Completed Sections RAW': ['Completed Sections']}),
         ]
@@ -120,6 +278,8 @@ class TestUpdateWriteThrough(unittest.TestCase):
             p.start()
 
     def tearDown(self):
+        # Let queued background writes finish while the patches are still active
+        wait_for_pending_writes()
         for p in self.patches:
             p.stop()
 
@@ -132,7 +292,9 @@ class TestUpdateWriteThrough(unittest.TestCase):
             {'Silver Credit': 'TRUE'}
         )
 
-        self.mock_worksheet.update_cell.assert_called()
+        wait_for_pending_writes()
+        self.mock_worksheet.batch_update.assert_called_once()
+        self.mock_worksheet.update_cell.assert_not_called()
 
     def test_update_updates_cache(self):
         """update should update cache after storage"""
@@ -179,5 +341,41 @@ class TestUpdateWriteThrough(unittest.TestCase):
         self.assertFalse(result)
 
 
+class TestRowUpdateRanges(unittest.TestCase):
+    """Tests for grouping a row's changed cells into update ranges"""
+
+    def setUp(self):
+        patcher = patch('models.data.rowcol_to_a1', side_effect=lambda row, col: f'{"ABCDEFGH"[col - 1]}{row}')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_adjacent_columns_share_one_range(self):
+        """Adjacent changed columns should be written as a single range"""
+        from models.data import _row_update_ranges
+
+        ranges = _row_update_ranges(5, {'Name': 1, 'Silver Credit': 2, 'Gold Credit': 3},
+                                    {'Gold Credit': 'FALSE', 'Silver Credit': 'TRUE'})
+
+        self.assertEqual(ranges, [{'range': 'B5:C5', 'values': [['TRUE', 'FALSE']]}])
+
+    def test_gaps_split_ranges(self):
+        """Non-adjacent columns should get separate ranges"""
+        from models.data import _row_update_ranges
+
+        ranges = _row_update_ranges(2, {'Name': 1, 'Team': 2, 'Present': 3, 'Has Bible': 4},
+                                    {'Name': 'Alice', 'Present': 'TRUE', 'Has Bible': 'FALSE'})
+
+        self.assertEqual(ranges, [
+            {'range': 'A2:A2', 'values': [['Alice']]},
+            {'range': 'C2:D2', 'values': [['TRUE', 'FALSE']]},
+        ])
+
+    def test_unknown_fields_skipped(self):
+        """Fields missing from the headers should be ignored"""
+        from models.data import _row_update_ranges
+
+        self.assertEqual(_row_update_ranges(2, {'Name': 1}, {'Missing': 'TRUE'}), [])
+
+
 if __name__ == '__main__':
     unittest.main()